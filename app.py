@@ -1,5 +1,6 @@
 import traceback
 import os
+import sys
 from dotenv import load_dotenv
 
 from flask import Flask
@@ -42,6 +43,29 @@ db.init_app(app)
 migrate = Migrate(app, db)
 
 app.register_blueprint(routes)
+
+from scan_jobs import scan_jobs
+app.register_blueprint(scan_jobs)
+
+from reverdict import reverdict_command
+app.cli.add_command(reverdict_command)
+
+from category_classifier import train_category_classifier_command
+app.cli.add_command(train_category_classifier_command)
+
+# Модель логотипов грузится и прогревается при старте воркера, а не на первом запросе.
+# CLI-команды (flask reverdict, flask db ...) импортируют app, но модель им не нужна.
+from logo_model import LOGO_MODEL_EAGER, logo_model, pin_logo_model_command
+app.cli.add_command(pin_logo_model_command)
+
+def is_serving():
+    """False for `flask <command>` runs other than `flask run`."""
+    if os.path.basename(sys.argv[0]) in ('flask', 'flask.exe') or sys.argv[0].endswith(os.path.join('flask', '__main__.py')):
+        return 'run' in sys.argv[1:]
+    return True
+
+if LOGO_MODEL_EAGER and is_serving():
+    logo_model.preload()
 @app.before_request
 def handle_options():
     """Разрешаем OPTIONS-запросы без проверки JWT"""
@@ -0,0 +1,252 @@
+"""Benchmarks for the ingredient engine in check.py.
+
+Measures per-call latency, throughput and memory of the matching engine
+across ingredient-list sizes, rule-set sizes and matching paths (exact,
+phrase, fuzzy, E-number), of check_halal_status itself on the live rules
+(verdict cache off, so every call does the work), plus the batch API. Results are written as JSON
+so runs can be compared:
+
+    python benchmarks/bench_check.py --output bench.json
+    python benchmarks/bench_check.py --baseline bench.json   # flag regressions
+
+--corpus takes an arbuz scrape CSV (the "ingredients" column written by
+products_scraping.ipynb) for a realistic workload.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import check  # noqa: E402
+
+COMMON = [
+    "вода", "сахар", "соль", "молоко цельное", "масло подсолнечное", "лимонная кислота",
+    "ароматизатор идентичный натуральному", "крахмал кукурузный", "мука пшеничная",
+    "какао-порошок", "сухое обезжиренное молоко", "регулятор кислотности",
+]
+TYPO_ALPHABET = "абвгдежзиклмнопрстуфхцчшыэюя"
+
+
+def _typo(word, rng):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(TYPO_ALPHABET) + word[i + 1:]
+
+
+def build_corpus(path, size, rng, vocab):
+    """Ingredient lists of `size` items that exercise one matching path."""
+    singles = [t for t in vocab if " " not in t and not t[1:].isdigit()]
+    phrases = [t for t in vocab if " " in t]
+    codes = [t for t in vocab if t[1:].isdigit()]
+
+    def item():
+        if rng.random() < 0.7:
+            return rng.choice(COMMON)
+        if path == "exact":
+            return rng.choice(singles)
+        if path == "phrase":
+            return f"{rng.choice(COMMON)} {rng.choice(phrases)}"
+        if path == "fuzzy":
+            return _typo(rng.choice([t for t in singles if len(t) >= check.FUZZY_MIN_LENGTH]), rng)
+        if path == "e-number":
+            code = rng.choice(codes)[1:]
+            return rng.choice([f"E{code}", f"Е {code}", f"эмульгатор E-{code}", f"e{code[0]} {code[1:]}"])
+        raise ValueError(path)
+
+    return [[item() for _ in range(size)] for _ in range(200)]
+
+
+def load_arbuz_corpus(path):
+    """Raw ingredient texts from an arbuz scrape CSV."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = [row.get("ingredients") or "" for row in csv.DictReader(f)]
+    return [text for text in rows if text and text != "Ingredients not found"]
+
+
+def scaled_rules(factor, rng):
+    """The live rule set padded with synthetic terms to `factor` times its size."""
+    rules = check.current_rules()
+    haram, suspected = set(rules.haram), set(rules.suspected)
+    base = sorted(haram | suspected)
+    for i in range((factor - 1) * len(base)):
+        term = f"{_typo(rng.choice(base), rng)} {i}"
+        (haram if i % 3 == 0 else suspected).add(term)
+    return haram, suspected
+
+
+@contextlib.contextmanager
+def verdict_cache_disabled():
+    """check_halal_status without its verdict cache, so repeats don't time cache hits."""
+    cache = check._VERDICT_CACHE
+    maxsize = cache.maxsize
+    cache.maxsize = 0
+    cache.clear()
+    try:
+        yield
+    finally:
+        cache.maxsize = maxsize
+
+
+def run_scenario(name, lists, matcher, fuzzy=False, repeat=3, single=False):
+    """Time one call per ingredient list; report latency percentiles, throughput and peak memory.
+
+    single=True calls check_halal_status (live rules, matcher must be the live
+    one); otherwise check_halal_status_many with the given matcher. The fuzzy
+    memo is cleared before every repeat, so each one pays for its fuzzy searches.
+    """
+    latencies = []
+    items = sum(len(lst) if not isinstance(lst, str) else 1 for lst in lists)
+    if single:
+        call = lambda lst: check.check_halal_status(lst, fuzzy=fuzzy)  # noqa: E731
+    else:
+        call = lambda lst: next(check.check_halal_status_many([lst], fuzzy=fuzzy, matcher=matcher))  # noqa: E731
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), verdict_cache_disabled():
+        for _ in range(repeat):
+            matcher.fuzzy_memo.clear()
+            for lst in lists:
+                start = time.perf_counter_ns()
+                call(lst)
+                latencies.append(time.perf_counter_ns() - start)
+
+        # Separate pass for memory: tracemalloc would distort the timings above
+        matcher.fuzzy_memo.clear()
+        tracemalloc.start()
+        for lst in lists:
+            call(lst)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies.sort()
+    total_s = sum(latencies) / 1e9
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] / 1e3  # noqa: E731
+    return {
+        "scenario": name,
+        "calls": len(latencies),
+        "p50_us": round(pct(0.50), 2),
+        "p95_us": round(pct(0.95), 2),
+        "p99_us": round(pct(0.99), 2),
+        "mean_us": round(statistics.fmean(latencies) / 1e3, 2),
+        "calls_per_s": round(len(latencies) / total_s, 1),
+        "ingredients_per_s": round(items * repeat / total_s, 1),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def run_batch(name, lists, matcher, processes=1):
+    """Throughput of check_halal_status_many over the whole corpus at once."""
+    start = time.perf_counter()
+    count = sum(1 for _ in check.check_halal_status_many(lists, processes=processes, matcher=matcher))
+    elapsed = time.perf_counter() - start
+    return {"scenario": name, "calls": count, "calls_per_s": round(count / elapsed, 1),
+            "total_ms": round(elapsed * 1000, 2)}
+
+
+def build_matcher(haram, suspected):
+    tracemalloc.start()
+    start = time.perf_counter()
+    matcher = check.IngredientMatcher(haram, suspected)
+    build_ms = (time.perf_counter() - start) * 1000
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return matcher, round(build_ms, 2), round(size / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="arbuz scrape CSV with an 'ingredients' column")
+    parser.add_argument("--sizes", default="5,20,50,200", help="ingredient-list sizes")
+    parser.add_argument("--rule-factors", default="1,4,16", help="rule-set size multipliers")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=0, help="process pool size for the batch run (0 = all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before flagging")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        check.current_rules()  # load rules up front; keep the load message out of the JSON on stdout
+
+    rng = random.Random(args.seed)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    factors = [int(f) for f in args.rule_factors.split(",")]
+    results = []
+    rule_sets = []
+
+    for factor in factors:
+        haram, suspected = scaled_rules(factor, random.Random(args.seed))
+        matcher, build_ms, size_kb = build_matcher(haram, suspected)
+        rule_sets.append({"factor": factor, "terms": len(haram) + len(suspected),
+                          "build_ms": build_ms, "matcher_kb": size_kb})
+        vocab = sorted(matcher.exact)
+
+        for path in ("exact", "phrase", "fuzzy", "e-number"):
+            for size in sizes:
+                lists = build_corpus(path, size, rng, vocab)
+                result = run_scenario(f"{path}/n={size}/rules=x{factor}", lists, matcher,
+                                      fuzzy=(path == "fuzzy"), repeat=args.repeat)
+                results.append(result)
+                print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+    live = check.current_rules().matcher
+    live_vocab = sorted(live.exact)
+    for path in ("exact", "phrase", "fuzzy", "e-number"):
+        for size in sizes:
+            lists = build_corpus(path, size, rng, live_vocab)
+            result = run_scenario(f"check_halal_status/{path}/n={size}", lists, live,
+                                  fuzzy=(path == "fuzzy"), repeat=args.repeat, single=True)
+            results.append(result)
+            print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+    if args.corpus:
+        texts = load_arbuz_corpus(args.corpus)
+        results.append(run_scenario("arbuz/raw-text", texts, live, repeat=args.repeat, single=True))
+        results.append(run_scenario("arbuz/raw-text/fuzzy", texts, live, fuzzy=True, repeat=args.repeat,
+                                    single=True))
+        batch = texts
+    else:
+        batch = build_corpus("exact", 20, rng, live_vocab) * 50
+    results.append(run_batch("batch/in-process", batch, live))
+    results.append(run_batch("batch/process-pool", batch, live, processes=args.processes))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rules_version": check.current_rules().version,
+        "rule_sets": rule_sets,
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            previous = {r["scenario"]: r for r in json.load(f)["results"]}
+        regressions = []
+        for result in results:
+            old = previous.get(result["scenario"])
+            if old and "p50_us" in result and result["p50_us"] > old["p50_us"] * (1 + args.tolerance):
+                regressions.append(f"{result['scenario']}: p50 {old['p50_us']}us -> {result['p50_us']}us")
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
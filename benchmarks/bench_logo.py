@@ -0,0 +1,170 @@
+"""Compare logo detection backends: latency, memory and accuracy.
+
+Each backend runs in its own process (so RSS is comparable) over the
+labelled QuramDetect-2/valid images:
+
+    python benchmarks/bench_logo.py
+    python benchmarks/bench_logo.py --backends torch,onnx:.model_cache/best-int8.onnx --output logo.json
+
+Backends are "torch" (LOGO_MODEL_PATH weights) or "onnx:<path>" (a file from
+export_logo_model.py). Accuracy is precision/recall of class-matched boxes at
+IoU >= 0.5 against the YOLO label files.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DATASET_DIR = os.path.join(BASE_DIR, "QuramDetect-2", "valid")
+DEFAULT_BACKENDS = ",".join([
+    "torch",
+    "onnx:" + os.path.join(BASE_DIR, ".model_cache", "best.onnx"),
+    "onnx:" + os.path.join(BASE_DIR, ".model_cache", "best-int8.onnx"),
+])
+
+
+def load_labels(label_path, width, height, names):
+    """Ground-truth (name, box) pairs from a YOLO label file."""
+    boxes = []
+    if not os.path.exists(label_path):
+        return boxes
+    with open(label_path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 5:
+                continue
+            cls_id, cx, cy, w, h = int(parts[0]), *map(float, parts[1:])
+            boxes.append((names[cls_id], ((cx - w / 2) * width, (cy - h / 2) * height,
+                                          (cx + w / 2) * width, (cy + h / 2) * height)))
+    return boxes
+
+
+def iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_counts(detections, truth, threshold=0.5):
+    """(true positives, detections, ground-truth boxes) with greedy one-to-one matching."""
+    unmatched = list(truth)
+    tp = 0
+    for detection in sorted(detections, key=lambda d: -d.confidence):
+        best = max(((iou(detection.box, box), i) for i, (name, box) in enumerate(unmatched)
+                    if name == detection.name), default=(0.0, None))
+        if best[0] >= threshold:
+            tp += 1
+            unmatched.pop(best[1])
+    return tp, len(detections), len(truth)
+
+
+def run_single(spec, repeat, batch_size):
+    """Benchmark one backend in this process and print its result as JSON."""
+    import psutil
+    import yaml
+    from PIL import Image
+
+    import logo_model
+
+    process = psutil.Process(os.getpid())
+    rss_before = process.memory_info().rss
+    backend, _, path = spec.partition(":")
+    manager = logo_model.LogoModelManager(logo_model.LOGO_MODEL_URL, logo_model.LOGO_MODEL_PATH,
+                                          logo_model.LOGO_MODEL_SHA256, backend, path or logo_model.LOGO_ONNX_PATH)
+    start = time.perf_counter()
+    detector = manager.get()
+    load_s = time.perf_counter() - start
+    rss_loaded = process.memory_info().rss
+
+    with open(os.path.join(os.path.dirname(DATASET_DIR), "data.yaml")) as f:
+        names = [n.lower() for n in yaml.safe_load(f)["names"]]
+    image_dir = os.path.join(DATASET_DIR, "images")
+    images, truths = [], []
+    for filename in sorted(os.listdir(image_dir)):
+        with Image.open(os.path.join(image_dir, filename)) as image:
+            image.load()
+            images.append(image.convert("RGB"))
+        label_path = os.path.join(DATASET_DIR, "labels", os.path.splitext(filename)[0] + ".txt")
+        truths.append(load_labels(label_path, images[-1].width, images[-1].height, names))
+
+    latencies, tp, n_det, n_truth = [], 0, 0, 0
+    for round_ in range(repeat):
+        for image, truth in zip(images, truths):
+            t0 = time.perf_counter()
+            detections = detector.detect([image])[0]
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if round_ == 0:
+                counts = match_counts(detections, truth)
+                tp, n_det, n_truth = tp + counts[0], n_det + counts[1], n_truth + counts[2]
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(images), batch_size):
+            detector.detect(images[i:i + batch_size])
+    batch_ms_per_image = (time.perf_counter() - t0) * 1000 / (repeat * len(images))
+
+    latencies.sort()
+    print(json.dumps({
+        "backend": spec,
+        "resolved_backend": detector.backend,
+        "load_s": round(load_s, 2),
+        "rss_loaded_mb": round(rss_loaded / 2 ** 20, 1),
+        "rss_model_mb": round((rss_loaded - rss_before) / 2 ** 20, 1),
+        "rss_peak_mb": round(process.memory_info().rss / 2 ** 20, 1),
+        "images": len(images),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        f"batch{batch_size}_ms_per_image": round(batch_ms_per_image, 2),
+        "precision": round(tp / n_det, 4) if n_det else None,
+        "recall": round(tp / n_truth, 4) if n_truth else None,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS, help="comma-separated: torch, onnx:<path>")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single, args.repeat, args.batch_size)
+        return
+
+    results = []
+    for spec in args.backends.split(","):
+        _, _, path = spec.partition(":")
+        if path and not os.path.exists(path):
+            print(f"skip {spec}: file not found (run export_logo_model.py)", file=sys.stderr)
+            continue
+        proc = subprocess.run([sys.executable, __file__, "--single", spec, "--repeat", str(args.repeat),
+                               "--batch-size", str(args.batch_size)], capture_output=True, text=True)
+        if proc.returncode:
+            print(f"{spec} failed:\n{proc.stderr}", file=sys.stderr)
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+    text = json.dumps({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results},
+                      ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import math
+import os
+import random
+import threading
+from collections import Counter
+
+import click
+import numpy as np
+from flask.cli import with_appcontext
+
+from category_registry import category_registry
+from check import normalize_ingredient, tokenize_ingredients
+from models import Product
+
+# Локальный классификатор категорий: TF-IDF по словам состава + ближайший центроид.
+# Обучается на связках Product.ingredients -> Product.description_id (импорт arbuz),
+# так что второй запрос к Gemini нужен только для неуверенных предсказаний.
+#
+#     flask train-category-classifier            # пишет CATEGORY_MODEL_PATH
+#     flask train-category-classifier --holdout 0.2
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATEGORY_MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH", os.path.join(BASE_DIR, "category_classifier.npz"))
+CATEGORY_CLASSIFIER_THRESHOLD = float(os.getenv("CATEGORY_CLASSIFIER_THRESHOLD", "0.55"))  # min cosine to the best centroid
+CATEGORY_CLASSIFIER_MARGIN = float(os.getenv("CATEGORY_CLASSIFIER_MARGIN", "0.05"))  # min lead over the runner-up
+CATEGORY_SHORTLIST_K = int(os.getenv("CATEGORY_SHORTLIST_K", "25"))  # categories offered to Gemini; 0 = all
+
+
+def ingredient_features(ingredients):
+    """Bag of normalized words of an ingredient list (raw text or list)."""
+    words = []
+    for ingredient in tokenize_ingredients(ingredients or ""):
+        words.extend(w for w in normalize_ingredient(ingredient).split() if len(w) > 1 and not w.isdigit())
+    return Counter(words)
+
+
+class CategoryClassifier:
+    """TF-IDF nearest-centroid model: one L2-normalized centroid per description id."""
+
+    def __init__(self, vocab, idf, centroids, class_ids, class_sizes=None):
+        self.vocab = vocab                # word -> column
+        self.idf = idf                    # float32[n_words]
+        self.centroids = centroids        # float32[n_classes, n_words], rows L2-normalized
+        self.class_ids = class_ids        # int64[n_classes], description ids
+        # int64[n_classes], training products per class
+        self.class_sizes = class_sizes if class_sizes is not None else np.zeros(len(class_ids), dtype=np.int64)
+
+    def vectorize(self, features):
+        """Sparse TF-IDF vector (columns, weights), L2-normalized; sublinear tf."""
+        cols, weights = [], []
+        for word, count in features.items():
+            col = self.vocab.get(word)
+            if col is not None:
+                cols.append(col)
+                weights.append((1.0 + math.log(count)) * self.idf[col])
+        if not cols:
+            return None
+        weights = np.asarray(weights, dtype=np.float32)
+        return np.asarray(cols), weights / np.linalg.norm(weights)
+
+    def scores(self, ingredients):
+        """Cosine similarity to every centroid (aligned with class_ids), or None if no known words."""
+        vector = self.vectorize(ingredient_features(ingredients))
+        if vector is None or not len(self.class_ids):
+            return None
+        cols, weights = vector
+        return self.centroids[:, cols] @ weights
+
+    def predict(self, ingredients):
+        """(description_id, confidence, margin) of the closest centroid, or None if no known words."""
+        scores = self.scores(ingredients)
+        if scores is None:
+            return None
+        if len(scores) > 1:
+            second, best = np.argpartition(scores, -2)[-2:]
+            margin = float(scores[best] - scores[second])
+        else:
+            best, margin = 0, float(scores[0])
+        return int(self.class_ids[best]), float(scores[best]), margin
+
+    @classmethod
+    def train(cls, samples, min_df=2, max_features=5000, min_class_size=3):
+        """Fit on (ingredients, description_id) pairs."""
+        docs = [(ingredient_features(ingredients), label) for ingredients, label in samples]
+        class_sizes = Counter(label for features, label in docs if features)
+        docs = [(f, label) for f, label in docs if f and class_sizes[label] >= min_class_size]
+
+        df = Counter(word for features, _ in docs for word in features)
+        words = [w for w, n in df.most_common(max_features) if n >= min_df]
+        vocab = {w: i for i, w in enumerate(sorted(words))}
+        idf = np.zeros(len(vocab), dtype=np.float32)
+        for word, col in vocab.items():
+            idf[col] = math.log((1 + len(docs)) / (1 + df[word])) + 1.0
+
+        labels = sorted({label for _, label in docs})
+        rows = {label: i for i, label in enumerate(labels)}
+        centroids = np.zeros((len(labels), len(vocab)), dtype=np.float32)
+        sizes = np.asarray([class_sizes[label] for label in labels], dtype=np.int64)
+        model = cls(vocab, idf, centroids, np.asarray(labels, dtype=np.int64), sizes)
+        for features, label in docs:
+            vector = model.vectorize(features)
+            if vector is not None:
+                centroids[rows[label], vector[0]] += vector[1]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms > 0, norms, 1.0)
+        return model
+
+    def save(self, path):
+        words = sorted(self.vocab, key=self.vocab.get)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, words=np.asarray(words, dtype=str), idf=self.idf,
+                            centroids=self.centroids, class_ids=self.class_ids, class_sizes=self.class_sizes)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            vocab = {str(w): i for i, w in enumerate(data["words"])}
+            sizes = data["class_sizes"] if "class_sizes" in data.files else None
+            return cls(vocab, data["idf"], data["centroids"], data["class_ids"], sizes)
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def current_classifier():
+    """The trained model at CATEGORY_MODEL_PATH (reloaded when the file changes), or None if there is none."""
+    global _model, _model_mtime
+    try:
+        mtime = os.stat(CATEGORY_MODEL_PATH).st_mtime
+    except OSError:
+        return None
+    if mtime != _model_mtime:
+        with _model_lock:
+            if mtime != _model_mtime:
+                _model = CategoryClassifier.load(CATEGORY_MODEL_PATH)
+                _model_mtime = mtime
+                print(f"🔄 Классификатор категорий загружен: {len(_model.class_ids)} категорий, {len(_model.vocab)} слов")
+    return _model
+
+
+def predict_category(ingredients):
+    """(description_id, confidence) if the local model is confident enough, else None."""
+    model = current_classifier()
+    if model is None:
+        return None
+    prediction = model.predict(ingredients)
+    if prediction is None:
+        return None
+    description_id, confidence, margin = prediction
+    if confidence < CATEGORY_CLASSIFIER_THRESHOLD or margin < CATEGORY_CLASSIFIER_MARGIN:
+        return None
+    return description_id, confidence
+
+
+def _stems(words):
+    return {word[:5] for word in words if len(word) > 2}
+
+
+def shortlist_categories(ingredients=None, k=CATEGORY_SHORTLIST_K):
+    """Names of the k existing categories most likely to fit the ingredients, best first.
+
+    Ranked by the classifier's centroid similarity (when a model is trained)
+    plus word-stem overlap between the category name and the ingredients;
+    ties, and the no-ingredients case, go to categories with more products.
+    k <= 0 returns every category.
+    """
+    categories = category_registry.items()
+    if k <= 0 or len(categories) <= k:
+        return [name for _, name in categories]
+
+    sizes = category_registry.sizes()
+    model = current_classifier()
+    scores = {}
+    model_scores = model.scores(ingredients) if model is not None and ingredients is not None else None
+    if model_scores is not None:
+        scores = dict(zip(model.class_ids.tolist(), model_scores.tolist()))
+    stems = _stems(ingredient_features(ingredients)) if ingredients is not None else set()
+
+    def rank(item):
+        category_id, name = item
+        name_stems = _stems(normalize_ingredient(name).split())
+        lexical = len(name_stems & stems) / len(name_stems) if name_stems else 0.0
+        return scores.get(category_id, 0.0) + 0.5 * lexical, sizes.get(category_id, 0)
+
+    ranked = sorted(categories, key=rank, reverse=True)
+    return [name for _, name in ranked[:k]]
+
+
+def _evaluate(model, samples):
+    """Accuracy and coverage of the thresholded model on held-out samples."""
+    covered = correct = 0
+    for ingredients, label in samples:
+        prediction = model.predict(ingredients)
+        if prediction is None:
+            continue
+        description_id, confidence, margin = prediction
+        if confidence >= CATEGORY_CLASSIFIER_THRESHOLD and margin >= CATEGORY_CLASSIFIER_MARGIN:
+            covered += 1
+            correct += description_id == label
+    return covered, correct
+
+
+@click.command("train-category-classifier")
+@click.option("--output", default=CATEGORY_MODEL_PATH, show_default=True, help="Where to write the model.")
+@click.option("--holdout", default=0.0, show_default=True, help="Share of products held out to report accuracy.")
+@click.option("--min-df", default=2, show_default=True)
+@click.option("--max-features", default=5000, show_default=True)
+@click.option("--min-class-size", default=3, show_default=True, help="Skip categories with fewer products.")
+@with_appcontext
+def train_category_classifier_command(output, holdout, min_df, max_features, min_class_size):
+    """Train the local category classifier from Product.ingredients -> description_id."""
+    samples = [(ingredients, description_id) for ingredients, description_id in
+               Product.query.with_entities(Product.ingredients, Product.description_id)
+               .filter(Product.description_id.isnot(None), Product.ingredients.isnot(None)).all()
+               if ingredients != "Ingredients not found"]
+    click.echo(f"Продуктов для обучения: {len(samples)}")
+
+    if holdout:
+        random.Random(42).shuffle(samples)
+        split = int(len(samples) * (1 - holdout))
+        model = CategoryClassifier.train(samples[:split], min_df, max_features, min_class_size)
+        covered, correct = _evaluate(model, samples[split:])
+        tested = len(samples) - split
+        click.echo(f"Отложено: {tested}, уверенных предсказаний: {covered} "
+                   f"({covered / max(tested, 1):.1%}), точность на них: {correct / max(covered, 1):.1%}")
+
+    model = CategoryClassifier.train(samples, min_df, max_features, min_class_size)
+    model.save(output)
+    click.echo(f"Модель сохранена: {output} ({len(model.class_ids)} категорий, {len(model.vocab)} слов)")
+
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import psycopg2
+
+# Категории продуктов (таблица description) в памяти воркера.
+# Раньше каждый скан открывал до трёх соединений: список названий для промпта,
+# LIKE-поиск и вставку. Теперь список грузится один раз и перечитывается, только
+# если после TTL дешёвая проверка версии (count, max id) показала изменения.
+
+DB_URL = os.getenv("DATABASE_URL")
+CATEGORY_REGISTRY_TTL = float(os.getenv("CATEGORY_REGISTRY_TTL", "300"))  # seconds between version checks
+
+
+def normalize_category(name):
+    return ' '.join(name.lower().split())
+
+
+class CategoryRegistry:
+    """Normalized category name -> (id, name) for every description row, kept per process."""
+
+    def __init__(self, db_url, ttl):
+        self.db_url = db_url
+        self.ttl = ttl
+        self.version = None
+        self.checked_at = 0.0
+        self._by_name = {}   # normalized name -> (id, name)
+        self._by_id = {}     # id -> name
+        self._sizes = {}     # id -> number of products, refreshed on every version check
+        self._rows = []      # (id, normalized name), in id order
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return psycopg2.connect(self.db_url)
+
+    def _ensure_fresh(self):
+        if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+            return
+        with self._lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+                return
+            conn = self._connect()
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT count(*), coalesce(max(id), 0) FROM description")
+                version = cur.fetchone()
+                if version != self.version:
+                    cur.execute("SELECT id, name FROM description ORDER BY id")
+                    self._load(cur.fetchall())
+                    self.version = version
+                    print(f"🔄 Категории загружены: {len(self._rows)}")
+                cur.execute("SELECT description_id, count(*) FROM product "
+                            "WHERE description_id IS NOT NULL GROUP BY description_id")
+                self._sizes = dict(cur.fetchall())
+            finally:
+                conn.close()
+            self.checked_at = time.monotonic()
+
+    def _load(self, rows):
+        by_name, by_id, ordered = {}, {}, []
+        for category_id, name in rows:
+            key = normalize_category(name)
+            by_name.setdefault(key, (category_id, name))
+            by_id[category_id] = name
+            ordered.append((category_id, key))
+        self._by_name, self._by_id, self._rows = by_name, by_id, ordered
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self.checked_at = 0.0
+
+    def names(self):
+        """Lowercased names of all categories, in id order."""
+        self._ensure_fresh()
+        return [key for _, key in self._rows]
+
+    def items(self):
+        """(id, lowercased name) of all categories, in id order."""
+        self._ensure_fresh()
+        return list(self._rows)
+
+    def get(self, category_id):
+        """Name of the category with this id, or None."""
+        self._ensure_fresh()
+        return self._by_id.get(category_id)
+
+    def sizes(self):
+        """Category id -> number of products in it (as of the last version check)."""
+        self._ensure_fresh()
+        return self._sizes
+
+    def find(self, category_name):
+        """(name, id) of the category matching category_name, or (None, None).
+
+        An exact (case/whitespace-insensitive) match wins; otherwise the first
+        category whose name contains it, as the old LIKE '%name%' query did.
+        """
+        self._ensure_fresh()
+        by_name, rows = self._by_name, self._rows
+        key = normalize_category(category_name)
+        hit = by_name.get(key)
+        if hit:
+            return hit[1], hit[0]
+        if not key:
+            return None, None
+        for category_id, name in rows:
+            if key in name:
+                return by_name[name][1], category_id
+        return None, None
+
+    def insert(self, category_name):
+        """Insert a new category and return its id (the existing id if another worker got there first)."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("INSERT INTO description (name) VALUES (%s) RETURNING id", (category_name,))
+            category_id = cur.fetchone()[0]
+            conn.commit()
+        except psycopg2.IntegrityError:
+            conn.rollback()
+            self.version = None  # reload unconditionally: the row is there, our snapshot just predates it
+            _, category_id = self.find(category_name)
+            if category_id is None:
+                raise
+            return category_id
+        finally:
+            conn.close()
+
+        with self._lock:
+            key = normalize_category(category_name)
+            self._by_name.setdefault(key, (category_id, category_name))
+            self._by_id = {**self._by_id, category_id: category_name}
+            self._rows = self._rows + [(category_id, key)]
+        return category_id
+
+    def stats(self):
+        return {
+            "categories": len(self._rows),
+            "version": list(self.version) if self.version else None,
+            "checked_ago_s": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "ttl_s": self.ttl,
+        }
+
+
+category_registry = CategoryRegistry(DB_URL, CATEGORY_REGISTRY_TTL)
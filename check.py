@@ -1,1415 +1,665 @@
+import hashlib
+import json
+import os
+import pickle
 import re
-from fuzzywuzzy import fuzz
-
-# 🟢 Ingredient Lists
-ALL_INGREDIENTS = {
-    "haram": {
-        # E120 – Кармин / Кошениль / Карминовая кислота
-        "e120",
-        "кармин",
-        "кошениль",
-        "карминовая кислота",
-        "кохиниль",
-        "қызыл бояу",
-        "кармин қышқылы",
-
-        # E904 – Шеллак
-        "e904",
-        "шеллак",
-        "стиклак",
-        "смола гуммилака",
-        "штоклак",
-        "гуммилак шайыры",
-        "шеллак шайыры",
-
-        # E1000 – Аскорбилпальмитат
-        "e1000",
-        "аскорбилпальмитат",
-        "аскорбин қышқылы пальмитаты",
-
-        # E1001 – Холин
-        "e1001",
-        "холин",
-        "витамин b4",
-        "холин хлорид",
-        "холин битартрат",
-        "холин гидроген тартрат",
-        "холин гидрохлорид",
-        "холин битартраты",
-        "холин гидротартраты",
-        "холин гидрохлориді",
-
-        # E1510 – Этанол
-        "e1510",
-        "этанол",
-        "этиловый спирт",
-        "спирт",
-        "этил спирті",
-        "этил спирт",
-        "этанол спирті",
-        "этанол спирт",
-        "этанол гидрат",
-        "этил гидрат",
-        "этил гидраты",
-        "этанол гидраты",
-        "этил гидраты спирті",
-        "этанол гидраты спирті",
-        "этил гидрат спирті",
-        "этанол гидрат спирті"
-
-        # E103 – Алканин
-        "e103",
-        "алканин",          # Russian: Алканин
-        "алканет",          # Russian: Алканет
-        "анхузин",          # Russian: Анхузин
-        "қызыл бояу",       # Kazakh: қызыл бояу
-
-        # E121 – Цитрусовый красный 2
-        "e121",
-        "цитрусовый красный 2",  # Russian: Цитрусовый красный 2
-        "citrus red 2",          # English: Citrus Red 2
-        "қызғылт сары бояу",     # Kazakh: қызғылт сары бояу
-
-        # E125 – Пунцовый SX
-        "e125",
-        "пунцовый sx",      # Russian: Пунцовый SX
-        "scarlet gn",       # English: Scarlet GN
-        "ponceau sx",       # French: Ponceau SX
-        "қызыл бояу",       # Kazakh: қызыл бояу
-
-        # E129 – Красный очаровательный АС
-        "e129",
-        "красный очаровательный ас",  # Russian: Красный очаровательный АС
-        "allura red ac",              # English: Allura Red AC
-        "қызыл бояу",                 # Kazakh: қызыл бояу
-
-        # E182 – Орсейл
-        "e182",
-        "орсейл",            # Russian: Орсейл
-        "орсеин",            # Russian: Орсеин
-        "orchil",            # English: Orchil
-        "қызыл-күлгін бояу", # Kazakh: қызыл-күлгін бояу
-
-        # E240 – Формальдегид
-        "e240",
-        "формальдегид",      # Russian: Формальдегид
-        "метаналь",          # Russian: Метаналь
-        "құмырсқа альдегиді",# Kazakh: құмырсқа альдегиді
-
-        # E313 – Этилгаллат
-        "e313",
-        "этилгаллат",               # Russian: Этилгаллат
-        "этиловый эфир галловой кислоты",  # Russian: Этиловый эфир галловой кислоты
-        "этил галлаты",             # Kazakh: этил галлаты
-        "галл қышқылының этил эфирі",  # Kazakh: галл қышқылының этил эфирі
-
-        # E314 – Гваяковая смола
-        "e314",
-        "гваяковая смола",          # Russian: Гваяковая смола
-        "гумми гваяк",              # Russian: Гумми гваяк
-        "гвайак шайыры",            # Kazakh: гвайак шайыры
-        "гумми гвайак шайыры",      # Kazakh: гумми гвайак шайыры
-
-        # E324 – Этоксихин
-        "e324",
-        "этоксихин",                # Russian: Этоксихин
-        "этоксикуин",               # Russian: Этоксикуин
-        "этоксикин",                # Kazakh: этоксикин
-        "этоксикуин",               # Kazakh: этоксикуин
-
-        # E388 – Тиодипропионовая кислота
-        "e388",
-        "тиодипропионовая кислота", # Russian: Тиодипропионовая кислота
-        "тиодипропион қышқылы",     # Kazakh: тиодипропион қышқылы
-
-        # E389 – Дилаурилтиодипропионат
-        "e389",
-        "дилаурилтиодипропионат",   # Russian: Дилаурилтиодипропионат
-        "дил лаурил тиодипропионат",# Kazakh: дил лаурил тиодипропионат
-
-        # E390 – Дистеарилтиодипропионат
-        "e390",
-        "дистеарилтиодипропионат",  # Russian: Дистеарилтиодипропионат
-        "дистеарилтиодипропион қышқылы",  # Kazakh: Дистеарилтиодипропион қышқылы
-
-        # E391 – Фитиновая кислота
-        "e391",
-        "фитиновая кислота",  # Russian: Фитиновая кислота
-        "инозитол гексафосфат",  # Russian: Инозитол гексафосфат
-        "фитин қышқылы",  # Kazakh: Фитин қышқылы
-        "инозитол гексафосфаты",  # Kazakh: Инозитол гексафосфаты
-
-        # E399h – Кальция динатрий ЭДТА
-        "e399h",
-        "кальция динатрий эдта",  # Russian: Кальция динатрий ЭДТА
-        "этилендиаминтетрауксусная кислота кальция динатриевая соль",  # Russian: Этилендиаминтетрауксусная кислота кальция динатриевая соль
-        "кальций динатрий эдта",  # Kazakh: Кальций динатрий ЭДТА
-        "этилендиаминтетрауксус қышқылының кальций динатрий тұзы",  # Kazakh: Этилендиаминтетрауксус қышқылының кальций динатрий тұзы
-
-        # E425 – Конжаковая камедь
-        "e425",
-        "конжаковая камедь",  # Russian: Конжаковая камедь
-        "конжаковый глюкоманнан",  # Russian: Конжаковый глюкоманнан
-        "конжак камеді",  # Kazakh: Конжак камеді
-        "конжак глюкоманнаны",  # Kazakh: Конжак глюкоманнаны
-
-        # E479 – Термически окисленное соевое масло
-        "e479",
-        "термически окисленное соевое масло",  # Russian: Термически окисленное соевое масло
-        "соевое масло, окисленное при нагревании",  # Russian: Соевое масло, окисленное при нагревании
-        "жылумен тотыққан соя майы",  # Kazakh: Жылумен тотыққан соя майы
-        "жылумен өңделген соя майы",  # Kazakh: Жылумен өңделген соя майы
-
-        # E480 – Диоцтилсульфосукцинат натрия
-        "e480",
-        "диоктилсульфосукцинат натрия",  # Russian: Диоцтилсульфосукцинат натрия
-        "натрий диоктилсульфосукцинат",  # Russian: Натрий диоктилсульфосукцинат
-        "натрий докузат",                # Russian: Натрий докузат
-        "натрий додецилсульфат",         # Russian: Натрий додецилсульфат
-        "натрий лаурилсульфат",          # Russian: Натрий лаурилсульфат
-        "натрий диоктилсульфосукцинаты", # Kazakh: Натрий диоктилсульфосукцинаты
-        "натрий докузат",                # Kazakh: Натрий докузат
-        "натрий додецилсульфат",         # Kazakh: Натрий додецилсульфат
-        "натрий лаурилсульфат",          # Kazakh: Натрий лаурилсульфат
-
-        # E484 – Стеарилцитрат
-        "e484",
-        "стеарилцитрат",                 # Russian: Стеарилцитрат
-        "глицерил полиэтиленгликоль рицинолеат",  # Russian: Глицерил полиэтиленгликоль рицинолеат
-        "стеарил цитраты",               # Kazakh: Стеарил цитраты
-        "глицерил полиэтиленгликоль рицинолеат",  # Kazakh: Глицерил полиэтиленгликоль рицинолеат
-
-        # E486 – Кальция стеароилфумарат
-        "e486",
-        "кальция стеароилфумарат",       # Russian: Кальция стеароилфумарат
-        "стеароилфумарат кальция",       # Russian: Стеароилфумарат кальция
-        "кальций стеароилфумараты",      # Kazakh: Кальций стеароилфумараты
-        "стеароилфумарат кальций",       # Kazakh: Стеароилфумарат кальций
-
-        # E487 – Натрия лаурилсульфат
-        "e487",
-        "натрия лаурилсульфат",          # Russian: Натрия лаурилсульфат
-        "лаурилсульфат натрия",          # Russian: Лаурилсульфат натрия
-        "натрий лаурилсульфат",          # Kazakh: Натрий лаурилсульфат
-        "лаурилсульфат натрий",          # Kazakh: Лаурилсульфат натрий
-
-        # E488 – Этоксилированные моно- и диглицериды
-        "e488",
-        "этоксилированные моно- и диглицериды",  # Russian: Этоксилированные моно- и диглицериды
-        "этоксилденген моно- және диглицеридтер",  # Kazakh: Этоксилденген моно- және диглицеридтер
-
-        # E489 – Метилглюкозид-кокосовое масло
-        "e489",
-        "метилглюкозид-кокосовое масло",  # Russian: Метилглюкозид-кокосовое масло
-        "метилглюкозид-кокос майы",  # Kazakh: Метилглюкозид-кокос майы
-
-        # E496 – Сорбитан триолеат
-        "e496",
-        "сорбитан триолеат",  # Russian: Сорбитан триолеат
-        "сорбитан триолеаты",  # Kazakh: Сорбитан триолеаты
-
-        # E505 – Карбонат железа
-        "e505",
-        "карбонат железа",  # Russian: Карбонат железа
-        "темір карбонаты",  # Kazakh: Темір карбонаты
-
-        # E537 – Ферроцианид железа
-        "e537",
-        "ферроцианид железа",  # Russian: Ферроцианид железа
-        "темір ферроцианиді",  # Kazakh: Темір ферроцианиді
-
-        # E538 – Кальция ферроцианид
-        "e538",
-        "кальция ферроцианид",  # Russian: Кальция ферроцианид
-        "кальций ферроцианиді",  # Kazakh: Кальций ферроцианиді
-        "желтая кровяная соль",  # Russian: Желтая кровяная соль
-        "сары қан тұзы",  # Kazakh: Сары қан тұзы
-        
-        # E557 – Калия алюмосиликат
-        "e557",
-        "калия алюмосиликат",  # Russian: Калия алюмосиликат
-        "калий алюмосиликаты",  # Kazakh: Калий алюмосиликаты
-
-        # E626 – Гуаниловая кислота
-        "e626",
-        "гуаниловая кислота",  # Russian: Гуаниловая кислота
-        "гуан қышқылы",  # Kazakh: Гуан қышқылы
-
-        # E700 – Бацитрацин
-        "e700",
-        "бацитрацин",  # Russian: Бацитрацин
-        "бацитрацин",  # Kazakh: Бацитрацин
-
-        # E701 – Тетрациклины
-        "e701",
-        "тетрациклины",  # Russian: Тетрациклины
-        "тетрациклиндер",  # Kazakh: Тетрациклиндер
-
-        # E710 – Спирамицины
-        "e710",
-        "спирамицины",  # Russian: Спирамицины
-        "спирамициндер",  # Kazakh: Спирамициндер
-
-        # E711 – Вирджинамицины
-        "e711",
-        "вирджинамицины",  # Russian: Вирджинамицины
-        "вирджинамициндер",  # Kazakh: Вирджинамициндер
-
-        # E712 – Флавомицин
-        "e712",
-        "флавомицин",  # Russian: Флавомицин
-        "флавомицин",  # Kazakh: Флавомицин
-        "бамбермицин",  # Russian: Бамбермицин
-        "бамбермицин",  # Kazakh: Бамбермицин
-
-        # E713 – Тилозин
-        "e713",
-        "тилозин",  # Russian: Тилозин
-        "тилозин",  # Kazakh: Тилозин
-
-        # E714 – Моназен А
-        "e714",
-        "моназен а",  # Russian: Моназен А
-        "моназен а",  # Kazakh: Моназен А
-
-        # E715 – Авопарсин
-        "e715",
-        "авопарсин",  # Russian: Авопарсин
-        "авопарсин",  # Kazakh: Авопарсин
-
-        # E716 – Салинономицин
-        "e716",
-        "салинономицин",  # Russian: Салинономицин
-        "салинономицин",  # Kazakh: Салинономицин
-
-        # E717 – Авиламицин
-        "e717",
-        "авиламицин",  # Russian: Авиламицин
-        "авиламицин",  # Kazakh: Авиламицин
-
-        # E906 – Бензойная смола (Бензоин)
-        "e906",
-        "бензойная смола",  # Russian: Бензойная смола
-        "бензоин",          # Russian: Бензоин
-        "бензой шайыры",    # Kazakh: Бензой шайыры
-        "бензоин",          # Kazakh: Бензоин
-
-        # E918 – Оксиды азота
-        "e918",
-        "оксиды азота",     # Russian: Оксиды азота
-        "азот оксидтері",   # Kazakh: Азот оксидтері
-
-        # E919 – Нитрозилхлорид
-        "e919",
-        "нитрозилхлорид",   # Russian: Нитрозилхлорид
-        "нитрозил хлориді", # Kazakh: Нитрозил хлориді
-
-        # E922 – Персульфат калия
-        "e922",
-        "персульфат калия", # Russian: Персульфат калия
-        "калий персульфаты",# Kazakh: Калий персульфаты
-
-        # E923 – Персульфат аммония
-        "e923",
-        "персульфат аммония", # Russian: Персульфат аммония
-        "аммоний персульфаты", # Kazakh: Аммоний персульфаты
-
-        # E929 – Пероксид ацетона
-        "e929",
-        "пероксид ацетона", # Russian: Пероксид ацетона
-        "ацетон пероксиді", # Kazakh: Ацетон пероксиді
-
-        # E940 – Дихлордифторометан
-        "e940",
-        "дихлордифторометан", # Russian: Дихлордифторометан
-        "дихлордифторометан", # Kazakh: Дихлордифторометан
-
-        # E946 – Октафторциклобутан
-        "e946",
-        "октафторциклобутан", # Russian: Октафторциклобутан
-        "октафторциклобутан", # Kazakh: Октафторциклобутан
-
-         "Тартрат кальция", "Экстракт Квиллайи",
-        "Аденозин 5'-монофосфат", "Алкоголь как растворитель для придания аромата",
-        "Алкоголь в сухой форме в качестве ингредиента", "Бекон", "Кусочки бекона",
-        "Бальзамический уксус", "Пиво", "Ароматизатор пива", "Экстракт пивных дрожжей",
-        "Пивные дрожжи", 
-          'E485',
-
-        #Общие
-        "кармины", "свинина","свинья","свиной жир","свиное сало","бекон","ветчина",
-        "алкоголь","этанол","этиловый спирт","спирт","пиво","вино","ликёр","ром","водка","виски","коньяк","шампанское","бренди",
-        "желатин","сычуг","сычужный фермент","реннин",
-        "печень свиная","кровь","кровяная мука",
-        "икра не халяль","рыба без чешуи",
-        "ванильный экстракт с алкоголем","ароматизатор с алкоголем", #Russian
-
-        "карминдер","шошқа еті","шошқа","шошқаның майы","шошқаның тоң майы","бекон","ветчина",
-        "алкоголь","этанол","этил спирті","спирт","сыра","шарап","ликер","ром","арақ","виски","коньяк","шампан","бренди",
-        "желатин","сычук","сычук ферменті","реннин",
-        "шошқаның бауыры","қан","қан ұны",
-        "халал емес уылдырық","қабыршақсыз балық",
-        "алкоголь қосылған ваниль экстракты","алкоголь қосылған хош иістендіргіш" #Kazakh
-
-    },
-
-##########################################################################################################################################
-
-    "suspected": {
-        
-        # E482 – Кальций стеароил-2-лактилат
-        "e482",
-        "кальций стеароил-2-лактилат",  # Russian: Кальций стеароил-2-лактилат
-        "кальций стеароил-2-лактилаты",  # Kazakh: Кальций стеароил-2-лактилаты
-
-        # E441 – Желатин
-        "e441",
-        "желатин",  # Russian: Желатин
-        "желатин",  # Kazakh: Желатин
-
-        # E471 – Моно- и диглицериды жирных кислот
-        "e471",
-        "моно- и диглицериды жирных кислот",  # Russian: Моно- и диглицериды жирных кислот
-        "май қышқылдарының моно- және диглицеридтері",  # Kazakh: Май қышқылдарының моно- және диглицеридтері
-
-        # E472a – Эфиры уксусной кислоты с моно- и диглицеридами жирных кислот
-        "e472a",
-        "эфиры уксусной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры уксусной кислоты с моно- и диглицеридами жирных кислот
-        "сірке қышқылының моно- және диглицеридтерімен эфирлері",  # Kazakh: Сірке қышқылының моно- және диглицеридтерімен эфирлері
-
-        # E472b – Эфиры молочной кислоты с моно- и диглицеридами жирных кислот
-        "e472b",
-        "эфиры молочной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры молочной кислоты с моно- и диглицеридами жирных кислот
-        "сүт қышқылының моно- және диглицеридтерімен эфирлері",  # Kazakh: Сүт қышқылының моно- және диглицеридтерімен эфирлері
-
-        # E472c – Эфиры лимонной кислоты с моно- и диглицеридами жирных кислот
-        "e472c",
-        "эфиры лимонной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры лимонной кислоты с моно- и диглицеридами жирных кислот
-        "лимон қышқылының моно- және диглицеридтерімен эфирлері",  # Kazakh: Лимон қышқылының моно- және диглицеридтерімен эфирлері
-
-        # E472d – Эфиры винной кислоты с моно- и диглицеридами жирных кислот
-        "e472d",
-        "эфиры винной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры винной кислоты с моно- и диглицеридами жирных кислот
-        "шарап қышқылының моно- және диглицеридтерімен эфирлері",  # Kazakh: Шарап қышқылының моно- және диглицеридтерімен эфирлері
-
-        # E472e – Эфиры диацетилвинной кислоты с моно- и диглицеридами жирных кислот
-        "e472e",
-        "эфиры диацетилвинной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры диацетилвинной кислоты с моно- и диглицеридами жирных кислот
-        "диацетилшарап қышқылының моно- және диглицеридтерімен эфирлері",  # Kazakh: Диацетилшарап қышқылының моно- және диглицеридтерімен эфирлері
-
-        # E472f – Смешанные эфиры уксусной и винной кислот с моно- и диглицеридами жирных кислот
-        "e472f",
-        "смешанные эфиры уксусной и винной кислот с моно- и диглицеридами жирных кислот",  # Russian: Смешанные эфиры уксусной и винной кислот с моно- и диглицеридами жирных кислот
-        "сірке және шарап қышқылдарының моно- және диглицеридтерімен аралас эфирлері",  # Kazakh: Сірке және шарап қышқылдарының моно- және диглицеридтерімен аралас эфирлері
-
-        # E472g – Эфиры янтарной кислоты с моно- и диглицеридами жирных кислот
-        "e472g",
-        "эфиры янтарной кислоты с моно- и диглицеридами жирных кислот",  # Russian: Эфиры янтарной кислоты с моно- и диглицеридами жирных кислот
-        "янтарь қышқылының моно- және диглицеридтерімен эфирлері",
-
-        # E542 – Костный фосфат (Bone phosphate)
-        "e542",
-        "костный фосфат",  # Russian: Костный фосфат
-        "сүйек фосфаты",   # Kazakh: Сүйек фосфаты
-        "фосфат кальция",  # Russian: Фосфат кальция
-        "кальций фосфаты", # Kazakh: Кальций фосфаты
-
-        # E544 – Полифосфат кальция (Calcium polyphosphate)
-        "e544",
-        "полифосфат кальция",  # Russian: Полифосфат кальция
-        "кальций полифосфаты", # Kazakh: Кальций полифосфаты
-
-        # E620 – Глутаминовая кислота (Glutamic acid)
-        "e620",
-        "глутаминовая кислота",  # Russian: Глутаминовая кислота
-        "глутамин қышқылы",      # Kazakh: Глутамин қышқылы
-
-        # E621 – Глутамат натрия (Monosodium glutamate)
-        "e621",
-        "глутамат натрия",       # Russian: Глутамат натрия
-        "натрий глутаматы",      # Kazakh: Натрий глутаматы
-        "мононатриевая соль глутаминовой кислоты",  # Russian: Мононатриевая соль глутаминовой кислоты
-        "глутамин қышқылының мононатрий тұзы",      # Kazakh: Глутамин қышқылының мононатрий тұзы
-
-        # E622 – Глутамат калия (Monopotassium glutamate)
-        "e622",
-        "глутамат калия",        # Russian: Глутамат калия
-        "калий глутаматы",       # Kazakh: Калий глутаматы
-        "монокалиевая соль глутаминовой кислоты",  # Russian: Монокалиевая соль глутаминовой кислоты
-        "глутамин қышқылының монокалий тұзы",      # Kazakh: Глутамин қышқылының монокалий тұзы
-
-        # E623 – Глутамат кальция (Calcium diglutamate)
-        "e623",
-        "глутамат кальция",      # Russian: Глутамат кальция
-        "кальций глутаматы",     # Kazakh: Кальций глутаматы
-        "дикальциевая соль глутаминовой кислоты",  # Russian: Дикальциевая соль глутаминовой кислоты
-        "глутамин қышқылының дикальций тұзы",      # Kazakh: Глутамин қышқылының дикальций тұзы
-
-        # E624 – Глутамат аммония (Monoammonium glutamate)
-        "e624",
-        "глутамат аммония",      # Russian: Глутамат аммония
-        "аммоний глутаматы",     # Kazakh: Аммоний глутаматы
-        "моноаммониевая соль глутаминовой кислоты",  # Russian: Моноаммониевая соль глутаминовой кислоты
-        "глутамин қышқылының моноаммоний тұзы",      # Kazakh: Глутамин қышқылының моноаммоний тұзы
-
-        # E640 – Глицин и его натриевая соль (Glycine and its sodium salt)
-        "e640",
-        "глицин",                # Russian: Глицин
-        "глицин",                # Kazakh: Глицин
-        "аминоуксусная кислота", # Russian: Аминоуксусная кислота
-        "аминсірке қышқылы",     # Kazakh: Аминсірке қышқылы
-        "натриевая соль глицина",# Russian: Натриевая соль глицина
-        "глициннің натрий тұзы", # Kazakh: Глициннің натрий тұзы
-
-        # E642 – Лизина гидрохлорид (Lysine hydrochloride)
-        "e642",
-        "лизина гидрохлорид",    # Russian: Лизина гидрохлорид
-        "лизин гидрохлориді",    # Kazakh: Лизин гидрохлориді
-        "гидрохлорид лизина",    # Russian: Гидрохлорид лизина
-        "лизиннің гидрохлориді", # Kazakh: Лизиннің гидрохлориді
-
-        # E907 – Воск канделильский (Candelilla wax)
-        "e907",
-        "воск канделильский",  # Russian: Воск канделильский
-        "канделилла балауызы", # Kazakh: Канделилла балауызы
-
-        # E920 – L-цистеин (L-Cysteine)
-        "e920",
-        "l-цистеин",           # Russian: L-цистеин
-        "l-цистеин",           # Kazakh: L-цистеин
-        "цистеин",             # Russian: Цистеин
-        "цистеин",             # Kazakh: Цистеин
-
-        # E921 – Хлорид L-цистеина (L-Cysteine hydrochloride)
-        "e921",
-        "хлорид l-цистеина",   # Russian: Хлорид L-цистеина
-        "l-цистеин гидрохлориді", # Kazakh: L-цистеин гидрохлориді
-
-        # E1100 – Амилазы (Amylases)
-        "e1100",
-        "амилазы",             # Russian: Амилазы
-        "амилазалар",          # Kazakh: Амилазалар
-
-        # E1101 – Протеазы (Proteases)
-        "e1101",
-        "протеазы",            # Russian: Протеазы
-        "протеазалар",         # Kazakh: Протеазалар
-        "папаин",              # Russian: Папаин
-        "папаин",              # Kazakh: Папаин
-        "бромелайн",           # Russian: Бромелайн
-        "бромелайн",           # Kazakh: Бромелайн
-        "фицин",               # Russian: Фицин
-        "фицин",               # Kazakh: Фицин
-
-        # E1103 – Инвертаза (Invertase)
-        "e1103",
-        "инвертаза",           # Russian: Инвертаза
-        "инвертаза",           # Kazakh: Инвертаза
-
-        # E1104 – Липазы (Lipases)
-        "e1104",
-        "липазы",              # Russian: Липазы
-        "липазалар",           # Kazakh: Липазалар
-
-        # E1105 – Лизоцим (Lysozyme)
-        "e1105",
-        "лизоцим",             # Russian: Лизоцим
-        "лизоцим",             # Kazakh: Лизоцим
-
-        # E1516 – Моноацетин (Monoacetin)
-        "e1516",
-        "моноацетин",          # Russian: Моноацетин
-        "моноацетин",          # Kazakh: Моноацетин
-        "моноацетат глицерина",# Russian: Моноацетат глицерина
-        "глицерин моноацетаты",# Kazakh: Глицерин моноацетаты
-
-        # E1517 – Диацетин (Diacetin)
-        "e1517",
-        "диацетин",            # Russian: Диацетин
-        "диацетин",            # Kazakh: Диацетин
-        "диацетат глицерина",  # Russian: Диацетат глицерина
-        "глицерин диацетаты",  # Kazakh: Глицерин диацетаты
-
-        # E1518 – Триацетин (Triacetin)
-        "e1518",
-        "триацетин",           # Russian: Триацетин
-        "триацетин",           # Kazakh: Триацетин
-        "триацетат глицерина", # Russian: Триацетат глицерина
-        "глицерин триацетаты", # Kazakh: Глицерин триацетаты
-
-        ##############################
-        # if cases
-
-        # E100 – Куркумин (Curcumin)
-        "e100",
-        "куркумин",             # Russian: Куркумин
-        "куркумин",             # Kazakh: Куркумин
-        "турмерик",             # Russian: Турмерик
-        "куркума",              # Kazakh: Куркума
-
-        # E101 – Рибофлавин (Riboflavin)
-        "e101",
-        "рибофлавин",           # Russian: Рибофлавин
-        "рибофлавин",           # Kazakh: Рибофлавин
-        "витамин B2",           # Russian: Витамин B2
-        "витамин B2",           # Kazakh: Витамин B2
-
-        # E102 – Тартразин (Tartrazine)
-        "e102",
-        "тартразин",            # Russian: Тартразин
-        "тартразин",            # Kazakh: Тартразин
-
-        # E104 – Хинолиновый желтый (Quinoline Yellow)
-        "e104",
-        "хинолиновый желтый",   # Russian: Хинолиновый желтый
-        "хинолин сарысы",       # Kazakh: Хинолин сарысы
-
-        # E107 – Желтый 2G (Yellow 2G)
-        "e107",
-        "желтый 2g",            # Russian: Желтый 2G
-        "сары 2g",              # Kazakh: Сары 2G
-
-        # E110 – Сансет желтый FCF (Sunset Yellow FCF)
-        "e110",
-        "сансет желтый fcf",    # Russian: Сансет желтый FCF
-        "күн батуы сары fcf",   # Kazakh: Күн батуы сары FCF
-        "оранжевый желтый s",   # Russian: Оранжевый желтый S
-        "қызғылт сары s",       # Kazakh: Қызғылт сары S
-
-        # E122 – Азорубин (Azorubine)
-        "e122",
-        "азорубин",             # Russian: Азорубин
-        "азорубин",             # Kazakh: Азорубин
-        "кармуазин",            # Russian: Кармуазин
-        "кармуазин",            # Kazakh: Кармуазин
-
-        # E123 – Амарант (Amaranth)
-        "e123",
-        "амарант",              # Russian: Амарант
-        "амарант",              # Kazakh: Амарант
-
-        # E124 – Понсо 4R (Ponceau 4R)
-        "e124",
-        "понсо 4r",             # Russian: Понсо 4R
-        "понсо 4r",             # Kazakh: Понсо 4R
-        "кохиниль красный a",   # Russian: Кохиниль красный A
-        "кохиниль қызыл a",     # Kazakh: Кохиниль қызыл A
-
-        # E127 – Эритрозин (Erythrosine)
-        "e127",
-        "эритрозин",             # Russian: Эритрозин
-        "эритрозин",             # Kazakh: Эритрозин
-        "красный №3",           # Russian: Красный №3
-        "қызыл №3",             # Kazakh: Қызыл №3
-
-        # E128 – Красный 2G (Red 2G)
-        "e128",
-        "красный 2g",           # Russian: Красный 2G
-        "қызыл 2g",             # Kazakh: Қызыл 2G
-
-        # E131 – Патентованный синий V (Patent Blue V)
-        "e131",
-        "патентованный синий v", # Russian: Патентованный синий V
-        "патенттелген көк v",    # Kazakh: Патенттелген көк V
-
-        # E132 – Индиготин (Indigotine)
-        "e132",
-        "индиготин",            # Russian: Индиготин
-        "индиготин",            # Kazakh: Индиготин
-        "индиго кармин",        # Russian: Индиго кармин
-        "индиго кармин",        # Kazakh: Индиго кармин
-
-        # E133 – Бриллиантовый синий FCF (Brilliant Blue FCF)
-        "e133",
-        "бриллиантовый синий fcf", # Russian: Бриллиантовый синий FCF
-        "жарқыраған көк fcf",      # Kazakh: Жарқыраған көк FCF
-
-        # E140 – Хлорофиллы и хлорофиллины (Chlorophylls and Chlorophyllins)
-        "e140",
-        "хлорофиллы",            # Russian: Хлорофиллы
-        "хлорофиллдер",          # Kazakh: Хлорофиллдер
-        "хлорофиллины",          # Russian: Хлорофиллины
-        "хлорофиллиндер",        # Kazakh: Хлорофиллиндер
-
-        # E141 – Комплексы хлорофиллов с медью (Copper complexes of chlorophylls)
-        "e141",
-        "комплексы хлорофиллов с медью", # Russian: Комплексы хлорофиллов с медью
-        "хлорофиллдердің мыс кешендері",  # Kazakh: Хлорофиллдердің мыс кешендері
-        "натриевая медная соль хлорофиллина", # Russian: Натриевая медная соль хлорофиллина
-        "натрийлі мыс хлорофиллин тұзы",      # Kazakh: Натрийлі мыс хлорофиллин тұзы
-
-        # E142 – Зеленый S (Green S)
-        "e142",
-        "зеленый s",             # Russian: Зеленый S
-        "жасыл s",               # Kazakh: Жасыл S
-        "ярко-зеленый s",        # Russian: Ярко-зеленый S
-        "ашық жасыл s",          # Kazakh: Ашық жасыл S
-
-        # E151 – Бриллиантовый черный BN (Brilliant Black BN)
-        "e151",
-        "бриллиантовый черный bn", # Russian: Бриллиантовый черный BN
-        "жарқыраған қара bn",      # Kazakh: Жарқыраған қара BN
-        "чёрный pn",               # Russian: Чёрный PN
-        "қара pn",                 # Kazakh: Қара PN
-
-        # E153 – Растительный уголь
-        "e153",
-        "растительный уголь",
-        "өсімдік көмірі",
-        "активированный уголь",
-        "белсендірілген көмір",
-
-        # E154 – Коричневый FK
-        "e154",
-        "коричневый fk",
-        "қоңыр fk",
-
-        # E155 – Коричневый HT
-        "e155",
-        "коричневый ht",
-        "қоңыр ht",
-
-        # E160a – Альфа-каротин, Бета-каротин, Гамма-каротин
-        "e160a",
-        "альфа-каротин",
-        "бета-каротин",
-        "гамма-каротин",
-        "альфа-каротин",
-        "бета-каротин",
-        "гамма-каротин",
-
-        # E160c – Экстракт паприки
-        "e160c",
-        "экстракт паприки",
-        "паприка сығындысы",
-
-        # E160d – Ликопин
-        "e160d",
-        "ликопин",
-        "ликопин",
-
-        # E160e – Бета-апо-8'-каротиновая кислота (C30)
-        "e160e",
-        "бета-апо-8'-каротиновая кислота",
-        "бета-апо-8'-каротин қышқылы",
-
-        # E160f – Этиловый эфир бета-апо-8'-каротиновой кислоты (C30)
-        "e160f",
-        "этиловый эфир бета-апо-8'-каротиновой кислоты",
-        "бета-апо-8'-каротин қышқылының этил эфирі",
-
-        # E161a – Флавоксантин
-        "e161a",
-        "флавоксантин",
-        "флавоксантин",
-
-        # E161b – Лютеин
-        "e161b",
-        "лютеин",
-        "лютеин",
-
-        # E161c – Криптоксантин
-        "e161c",
-        "криптоксантин",
-        "криптоксантин",
-
-        # E161d – Рубиксантин
-        "e161d",
-        "рубиксантин",
-        "рубиксантин",
-
-        # E161e – Виолаксантин
-        "e161e",
-        "виолаксантин",
-        "виолаксантин",
-
-        # E161f – Родоксантин
-        "e161f",
-        "родоксантин",
-        "родоксантин",
-
-        # E161g – Кантаксантин
-        "e161g",
-        "кантаксантин",
-        "кантаксантин",
-
-        # E162 – Свекольный красный, бетанин
-        "e162",
-        "свекольный красный",
-        "бетанин",
-        "қызылша бояуы",
-
-        # E163 – Антоцианы
-        "e163",
-        "антоцианы",
-        "антоциандар",
-
-        # E170 – Карбонат кальция
-        "e170",
-        "карбонат кальция",
-        "кальций карбонаты",
-        "әктас",
-
-        # E180 – Литолрубин BK
-        "e180",
-        "литолрубин bk",
-        "литолрубин bk",
-        "қызыл бояу bk",
-
-        # E213 – Кальция бензоат (Calcium benzoate)
-        "e213",
-        "кальция бензоат",         # Russian: Кальция бензоат
-        "кальций бензоаты",        # Kazakh: Кальций бензоаты
-
-        # E214 – Этилпарагидроксибензоат (Ethylparaben)
-        "e214",
-        "этилпарагидроксибензоат", # Russian: Этилпарагидроксибензоат
-        "этилпарагидроксибензоат", # Kazakh: Этилпарагидроксибензоат
-        "этилпарабен",             # Russian: Этилпарабен
-        "этилпарабен",             # Kazakh: Этилпарабен
-
-        # E215 – Натрия этилпарагидроксибензоат (Sodium ethylparaben)
-        "e215",
-        "натрия этилпарагидроксибензоат", # Russian: Натрия этилпарагидроксибензоат
-        "натрий этилпарабені",            # Kazakh: Натрий этилпарабені
-
-        # E216 – Пропилпарагидроксибензоат (Propylparaben)
-        "e216",
-        "пропилпарагидроксибензоат", # Russian: Пропилпарагидроксибензоат
-        "пропилпарагидроксибензоат", # Kazakh: Пропилпарагидроксибензоат
-        "пропилпарабен",             # Russian: Пропилпарабен
-        "пропилпарабен",             # Kazakh: Пропилпарабен
-
-        # E217 – Натрия пропилпарагидроксибензоат (Sodium propylparaben)
-        "e217",
-        "натрия пропилпарагидроксибензоат", # Russian: Натрия пропилпарагидроксибензоат
-        "натрий пропилпарабені",            # Kazakh: Натрий пропилпарабені
-
-        # E218 – Метилпарагидроксибензоат (Methylparaben)
-        "e218",
-        "метилпарагидроксибензоат", # Russian: Метилпарагидроксибензоат
-        "метилпарагидроксибензоат", # Kazakh: Метилпарагидроксибензоат
-        "метилпарабен",             # Russian: Метилпарабен
-        "метилпарабен",             # Kazakh: Метилпарабен
-
-        # E219 – Натрия метилпарагидроксибензоат (Sodium methylparaben)
-        "e219",
-        "натрия метилпарагидроксибензоат", # Russian: Натрия метилпарагидроксибензоат
-        "натрий метилпарабені",            # Kazakh: Натрий метилпарабені
-
-        # E227 – Кальция гидросульфит (Calcium bisulfite)
-        "e227",
-        "кальция гидросульфит",     # Russian: Кальция гидросульфит
-        "кальций бисульфиті",       # Kazakh: Кальций бисульфиті
-        "кальция бисульфит",        # Russian: Кальция бисульфит
-        "кальций гидросульфиті",    # Kazakh: Кальций гидросульфиті
-
-        # E230 – Дифенил (Biphenyl)
-        "e230",
-        "дифенил",                  # Russian: Дифенил
-        "дифенил",                  # Kazakh: Дифенил
-        "бипенил",                  # Russian: Бипенил
-        "бипенил",                  # Kazakh: Бипенил
-
-        # E231 – Ортофенилфенол (Orthophenyl phenol)
-        "e231",
-        "ортофенилфенол",       # Russian: Ортофенилфенол
-        "ортофенилфенол",       # Kazakh: Ортофенилфенол
-        "2-фенилфенол",         # Russian: 2-Фенилфенол
-        "2-фенилфенол",         # Kazakh: 2-Фенилфенол
-
-        # E232 – Ортофенилфенолят натрия (Sodium orthophenyl phenol)
-        "e232",
-        "ортофенилфенолят натрия", # Russian: Ортофенилфенолят натрия
-        "натрий ортофенилфенолят", # Kazakh: Натрий ортофенилфенолят
-
-        # E233 – Тиабендазол (Thiabendazole)
-        "e233",
-        "тиабендазол",          # Russian: Тиабендазол
-        "тиабендазол",          # Kazakh: Тиабендазол
-
-        # E235 – Натамицин (Natamycin)
-        "e235",
-        "натамицин",            # Russian: Натамицин
-        "натамицин",            # Kazakh: Натамицин
-        "пимарицин",            # Russian: Пимарицин
-        "пимарицин",            # Kazakh: Пимарицин
-
-        # E236 – Муравьиная кислота (Formic acid)
-        "e236",
-        "муравьиная кислота",   # Russian: Муравьиная кислота
-        "құмырсқа қышқылы",     # Kazakh: Құмырсқа қышқылы
-
-        # E265 – Дегидроуксусная кислота (Dehydroacetic acid)
-        "e265",
-        "дегидроуксусная кислота", # Russian: Дегидроуксусная кислота
-        "дегидроацетил қышқылы",   # Kazakh: Дегидроацетил қышқылы
-
-        # E266 – Дегидроацетат натрия (Sodium dehydroacetate)
-        "e266",
-        "дегидроацетат натрия", # Russian: Дегидроацетат натрия
-        "натрий дегидроацетаты",# Kazakh: Натрий дегидроацетаты
-
-        # E270 – Молочная кислота (Lactic acid)
-        "e270",
-        "молочная кислота",     # Russian: Молочная кислота
-        "сүт қышқылы",          # Kazakh: Сүт қышқылы
-
-        # E282 – Пропионат кальция (Calcium propionate)
-        "e282",
-        "пропионат кальция",    # Russian: Пропионат кальция
-        "кальций пропионаты",   # Kazakh: Кальций пропионаты
-
-        # E284 – Борная кислота (Boric acid)
-        "e284",
-        "борная кислота",       # Russian: Борная кислота
-        "бор қышқылы",          # Kazakh: Бор қышқылы
-
-        # E285 – Тетраборат натрия (Sodium tetraborate)
-        "e285",
-        "тетраборат натрия",    # Russian: Тетраборат натрия
-        "натрий тетрабораты",   # Kazakh: Натрий тетрабораты
-        "бура",                 # Russian: Бура
-        "бура",                 # Kazakh: Бура
-
-        # E302 – Аскорбат кальция (Calcium ascorbate)
-        "e302",
-        "аскорбат кальция",     # Russian: Аскорбат кальция
-        "кальций аскорбаты",    # Kazakh: Кальций аскорбаты
-
-        # E304 – Аскорбилпальмитат (Ascorbyl palmitate)
-        "e304",
-        "аскорбилпальмитат",    # Russian: Аскорбилпальмитат
-        "аскорбил пальмитаты",  # Kazakh: Аскорбил пальмитаты
-
-        # E305 – Аскорбилстеарат (Ascorbyl stearate)
-        "e305",
-        "аскорбилстеарат",      # Russian: Аскорбилстеарат
-        "аскорбил стеараты",    # Kazakh: Аскорбил стеараты
-
-        # E306 – Токоферолы (Tocopherols)
-        "e306",
-        "токоферолы",           # Russian: Токоферолы
-        "токоферолдар",         # Kazakh: Токоферолдар
-        "витамин E",            # Russian: Витамин E
-        "витамин E",            # Kazakh: Витамин E
-
-        # E307 – Альфа-токоферол (Alpha-tocopherol)
-        "e307",
-        "альфа-токоферол",      # Russian: Альфа-токоферол
-        "альфа-токоферол",      # Kazakh: Альфа-токоферол
-
-        # E308 – Гамма-токоферол (Gamma-tocopherol)
-        "e308",
-        "гамма-токоферол",      # Russian: Гамма-токоферол
-        "гамма-токоферол",      # Kazakh: Гамма-токоферол
-
-        # E309 – Дельта-токоферол (Delta-tocopherol)
-        "e309",
-        "дельта-токоферол",     # Russian: Дельта-токоферол
-        "дельта-токоферол",     # Kazakh: Дельта-токоферол
-
-        # E311 – Октилгаллат (Octyl gallate)
-        "e311",
-        "октилгаллат",          # Russian: Октилгаллат
-        "октил галлаты",        # Kazakh: Октил галлаты
-
-        # E312 – Додецилгаллат (Dodecyl gallate)
-        "e312",
-        "додецилгаллат",        # Russian: Додецилгаллат
-        "додецил галлаты",      # Kazakh: Додецил галлаты
-
-         # E315 – Эриторбовая кислота (Erythorbic acid)
-        "e315",
-        "эриторбовая кислота",   # Russian: Эриторбовая кислота
-        "эриторб қышқылы",       # Kazakh: Эриторб қышқылы
-        "изоаскорбиновая кислота", # Russian: Изоаскорбиновая кислота
-        "изоаскорбин қышқылы",   # Kazakh: Изоаскорбин қышқылы
-
-        # E316 – Эриторбат натрия (Sodium erythorbate)
-        "e316",
-        "эриторбат натрия",      # Russian: Эриторбат натрия
-        "натрий эриторбаты",     # Kazakh: Натрий эриторбаты
-        "изоаскорбат натрия",    # Russian: Изоаскорбат натрия
-        "натрий изоаскорбаты",   # Kazakh: Натрий изоаскорбаты
-
-        # E318 – Эриторбат кальция (Calcium erythorbate)
-        "e318",
-        "эриторбат кальция",     # Russian: Эриторбат кальция
-        "кальций эриторбаты",    # Kazakh: Кальций эриторбаты
-        "изоаскорбат кальция",   # Russian: Изоаскорбат кальция
-        "кальций изоаскорбаты",  # Kazakh: Кальций изоаскорбаты
-
-        # E319 – Трет-бутилгидрохинон (Tert-butylhydroquinone, TBHQ)
-        "e319",
-        "трет-бутилгидрохинон",  # Russian: Трет-бутилгидрохинон
-        "трет-бутилгидрохинон",  # Kazakh: Трет-бутилгидрохинон
-
-        # E320 – Бутилгидроксианизол (Butylated hydroxyanisole, BHA)
-        "e320",
-        "бутилгидроксианизол",   # Russian: Бутилгидроксианизол
-        "бутилгидроксианизол",   # Kazakh: Бутилгидроксианизол
-
-        # E321 – Бутилгидрокситолуол (Butylated hydroxytoluene, BHT)
-        "e321",
-        "бутилгидрокситолуол",   # Russian: Бутилгидрокситолуол
-        "бутилгидрокситолуол",   # Kazakh: Бутилгидрокситолуол
-
-        # E322 – Лецитины (Lecithins)
-        "e322",
-        "лецитины",              # Russian: Лецитины
-        "лецитиндер",            # Kazakh: Лецитиндер
-
-        # E323 – Аноксомер (Anoxomer)
-        "e323",
-        "аноксомер",             # Russian: Аноксомер
-        "аноксомер",             # Kazakh: Аноксомер
-
-        # E325 – Лактат натрия (Sodium lactate)
-        "e325",
-        "лактат натрия",         # Russian: Лактат натрия
-        "натрий лактаты",        # Kazakh: Натрий лактаты
-
-        # E326 – Лактат калия (Potassium lactate)
-        "e326",
-        "лактат калия",          # Russian: Лактат калия
-        "калий лактаты",         # Kazakh: Калий лактаты
-
-        # E327 – Лактат кальция (Calcium lactate)
-        "e327",
-        "лактат кальция",        # Russian: Лактат кальция
-        "кальций лактаты",       # Kazakh: Кальций лактаты
-
-        # E328 – Лактат аммония (Ammonium lactate)
-        "e328",
-        "лактат аммония",        # Russian: Лактат аммония
-        "аммоний лактаты",       # Kazakh: Аммоний лактаты
-
-        # E329 – Лактат магния (Magnesium lactate)
-        "e329",
-        "лактат магния",         # Russian: Лактат магния
-        "магний лактаты",        # Kazakh: Магний лактаты
-
-        # E334 – Винная кислота (Tartaric acid)
-        "e334",
-        "винная кислота",        # Russian: Винная кислота
-        "шарап қышқылы",         # Kazakh: Шарап қышқылы
-
-        # E335 – Тартраты натрия (Sodium tartrates)
-        "e335",
-        "тартрат натрия",        # Russian: Тартрат натрия
-        "натрий тартраты",       # Kazakh: Натрий тартраты
-
-        # E336 – Тартраты калия (Potassium tartrates)
-        "e336",
-        "тартрат калия",         # Russian: Тартрат калия
-        "калий тартраты",        # Kazakh: Калий тартраты
-
-        # E337 – Тартрат калия-натрия (Sodium potassium tartrate)
-        "e337",
-        "тартрат калия-натрия",  # Russian: Тартрат калия-натрия
-        "натрий-калий тартраты", # Kazakh: Натрий-калий тартраты
-
-        # E345 – Цитрат магния (Magnesium citrate)
-        "e345",
-        "цитрат магния",         # Russian: Цитрат магния
-        "магний цитраты",        # Kazakh: Магний цитраты
-
-        # E367 – Фумарат кальция (Calcium fumarate)
-        "e367",
-        "фумарат кальция",       # Russian: Фумарат кальция
-        "кальций фумараты",      # Kazakh: Кальций фумараты
-
-        # E384 – Изопропилцитратная смесь (Isopropyl citrate mixture)
-        "e384",
-        "изопропилцитратная смесь",     # Russian
-        "изопропил цитрат қоспасы",     # Kazakh
-
-        # E387 – Октилгаллат (Octyl gallate)
-        "e387",
-        "октилгаллат",                  # Russian
-        "октил галлаты",                # Kazakh
-
-        # E429 – Пептоны (Peptones)
-        "e429",
-        "пептоны",                # Russian: Пептоны
-        "пептондар",              # Kazakh: Пептондар
-
-        # E430 – Полиоксиэтилен (8) стеарат (Polyoxyethylene (8) stearate)
-        "e430",
-        "полиоксиэтилен (8) стеарат",  # Russian: Полиоксиэтилен (8) стеарат
-        "полиоксиэтилен (8) стеараты",  # Kazakh: Полиоксиэтилен (8) стеараты
-
-        # E431 – Полиоксиэтилен (40) стеарат (Polyoxyethylene (40) stearate)
-        "e431",
-        "полиоксиэтилен (40) стеарат",  # Russian: Полиоксиэтилен (40) стеарат
-        "полиоксиэтилен (40) стеараты",  # Kazakh: Полиоксиэтилен (40) стеараты
-
-        # E432 – Полиоксиэтилен (20) сорбитан монолаурат (Polysorbate 20)
-        "e432",
-        "полиоксиэтилен (20) сорбитан монолаурат",  # Russian: Полиоксиэтилен (20) сорбитан монолаурат
-        "полиоксиэтилен (20) сорбитан монолаурат",  # Kazakh: Полиоксиэтилен (20) сорбитан монолаурат
-        "твин 20",                # Russian: Твин 20
-        "твин 20",                # Kazakh: Твин 20
-
-        # E433 – Полиоксиэтилен (20) сорбитан моноолеат (Polysorbate 80)
-        "e433",
-        "полиоксиэтилен (20) сорбитан моноолеат",  # Russian: Полиоксиэтилен (20) сорбитан моноолеат
-        "полиоксиэтилен (20) сорбитан моноолеат",  # Kazakh: Полиоксиэтилен (20) сорбитан моноолеат
-        "твин 80",                # Russian: Твин 80
-        "твин 80",                # Kazakh: Твин 80
-
-        # E434 – Полиоксиэтилен (20) сорбитан монопальмитат (Polysorbate 40)
-        "e434",
-        "полиоксиэтилен (20) сорбитан монопальмитат",  # Russian: Полиоксиэтилен (20) сорбитан монопальмитат
-        "полиоксиэтилен (20) сорбитан монопальмитат",  # Kazakh: Полиоксиэтилен (20) сорбитан монопальмитат
-        "твин 40",                # Russian: Твин 40
-        "твин 40",                # Kazakh: Твин 40
-
-        # E435 – Полиоксиэтилен (20) сорбитан моностеарат (Polysorbate 60)
-        "e435",
-        "полиоксиэтилен (20) сорбитан моностеарат",  # Russian: Полиоксиэтилен (20) сорбитан моностеарат
-        "полиоксиэтилен (20) сорбитан моностеарат",  # Kazakh: Полиоксиэтилен (20) сорбитан моностеарат
-        "твин 60",                # Russian: Твин 60
-        "твин 60",                # Kazakh: Твин 60
-
-        # E436 – Полиоксиэтилен (20) сорбитан тристеарат (Polysorbate 65)
-        "e436",
-        "полиоксиэтилен (20) сорбитан тристеарат",  # Russian: Полиоксиэтилен (20) сорбитан тристеарат
-        "полиоксиэтилен (20) сорбитан тристеарат",  # Kazakh: Полиоксиэтилен (20) сорбитан тристеарат
-        "твин 65",                # Russian: Твин 65
-        "твин 65",                # Kazakh: Твин 65
-
-        # E442 – Аммонийные соли фосфатидиловой кислоты (Ammonium phosphatides)
-        "e442",
-        "аммонийные соли фосфатидиловой кислоты",  # Russian: Аммонийные соли фосфатидиловой кислоты
-        "фосфатидил қышқылының аммоний тұздары",  # Kazakh: Фосфатидил қышқылының аммоний тұздары
-
-        # E444 – Сахарозы ацетат изобутират (Sucrose acetate isobutyrate)
-        "e444",
-        "сахарозы ацетат изобутират",  # Russian: Сахарозы ацетат изобутират
-        "сахароза ацетат изобутираты",  # Kazakh: Сахароза ацетат изобутираты
-
-        # E445 – Эфиры глицерина и смоляных кислот (Glycerol esters of wood rosin)
-        "e445",
-        "эфиры глицерина и смоляных кислот",  # Russian: Эфиры глицерина и смоляных кислот
-        "глицерин және шайыр қышқылдарының эфирлері",  # Kazakh: Глицерин және шайыр қышқылдарының эфирлері
-
-        # E446 – Сукцистеарин (Succistearin)
-        "e446",
-        "сукцистеарин",          # Russian: Сукцистеарин
-        "сукцистеарин",          # Kazakh: Сукцистеарин
-
-        # E451 – Трифосфаты (Triphosphates)
-        "e451",
-        "трифосфаты",
-        "трифосфаттар",
-
-        # E462 – Этилцеллюлоза (Ethyl cellulose)
-        "e462",
-        "этилцеллюлоза",
-        "этилцеллюлоза",
-
-        # E467 – Оксипропилцеллюлоза (Oxidized cellulose)
-        "e467",
-        "оксицеллюлоза",
-        "тотығулы целлюлоза",
-
-        # E468 – Кросскармеллоза натрия (Crosslinked sodium carboxymethyl cellulose)
-        "e468",
-        "карбоксиметилцеллюлоза натрия",
-        "натрий карбоксиметилцеллюлозасы",
-
-        # E470 – Соли жирных кислот (Salts of fatty acids)
-        "e470",
-        "соли жирных кислот",
-        "май қышқылдарының тұздары",
-
-        # E473 – Сахарозы эфиры жирных кислот (Sucrose esters of fatty acids)
-        "e473",
-        "эфиры сахарозы и жирных кислот",
-        "сахароза мен май қышқылдарының эфирлері",
-
-        # E474 – Сахароглицериды (Sugar esters of glycerol)
-        "e474",
-        "сахароглицериды",
-        "сахароглицеридтер",
-
-        # E475 – Полиглицериновые эфиры жирных кислот (Polyglycerol esters of fatty acids)
-        "e475",
-        "эфиры полиглицеридов и жирных кислот",
-        "полиглицерин мен май қышқылдарының эфирлері",
-
-        # E476 – Полирицинолеаты полиглицерина (Polyglycerol polyricinoleate)
-        "e476",
-        "полиглицериновые полирицинолеаты",
-        "полиглицерин полирицинолеаттары",
-
-        # E477 – Пропиленгликолевые эфиры жирных кислот (Propylene glycol esters of fatty acids)
-        "e477",
-        "эфиры пропиленгликоля и жирных кислот",
-        "пропиленгликоль мен май қышқылдарының эфирлері",
-
-        # E478 – Лактилаты жирных кислот и глицерина (Lactylated fatty acid esters of glycerol)
-        "e478",
-        "эфиры лактилированных жирных кислот глицерина",
-        "глицерин мен лактилирленген май қышқылдарының эфирлері",
-
-        # E481 – Стеароил-2-лактилат натрия (Sodium stearoyl-2-lactylate)
-        "e481",
-        "стеароил-2-лактилат натрия",
-        "натрий стеароил-2-лактилаты",
-
-        # E482 – Стеароил-2-лактилат кальция (Calcium stearoyl-2-lactylate)
-        "e482",
-        "стеароил-2-лактилат кальция",
-        "кальций стеароил-2-лактилаты",
-
-        # E483 – Стеарилтартрат (Stearyltartrate)
-        "e483",
-        "стеарилтартрат",
-        "стеарилтартрат",
-
-        # E491 – Моноглицериды (Sorbitan monostearate)
-        "e491",
-        "сорбитан монолеат",
-        "сорбитан монолеат",
-
-        # E492 – Сорбитан тристеарат (Sorbitan tristearate)
-        "e492",
-        "сорбитан тристеарат",
-        "сорбитан тристеарат",
-
-        # E493 – Сорбитан монолаурат (Sorbitan monolaurate)
-        "e493",
-        "сорбитан монолаурат",
-        "сорбитан монолаурат",
-
-        # E494 – Сорбитан монопальмитат (Sorbitan monopalmitate)
-        "e494",
-        "сорбитан монопальмитат",
-        "сорбитан монопальмитат",
-
-        # E495 – Сорбитан моноолеат (Sorbitan monooleate)
-        "e495",
-        "сорбитан моноолеат",
-        "сорбитан моноолеат",
-
-         # E511 – Magnesium chloride
-        "e511",
-        "магний хлорид",        # Russian: Магний хлорид
-        "магний хлориді",       # Kazakh: Магний хлориді
-
-        # E519 – Cupric ammonium carbonate
-        "e519",
-        "карбонат аммония меди", # Russian: Карбонат аммония меди
-        "медь аммоний карбонаты", # Kazakh: Медь аммоний карбонаты
-
-        # E541 – Sodium aluminium phosphate
-        "e541",
-        "фосфат натрия алюминия", # Russian: Фосфат натрия алюминия
-        "натрий алюминий фосфаты", # Kazakh: Натрий алюминий фосфаты
-
-        # E555 – Potassium aluminium silicate
-        "e555",
-        "силикат калия алюминия", # Russian: Силикат калия алюминия
-        "калий алюминий силикаты", # Kazakh: Калий алюминий силикаты
-
-        # E556 – Calcium aluminium silicate
-        "e556",
-        "силикат кальция алюминия", # Russian: Силикат кальция алюминия
-        "кальций алюминий силикаты", # Kazakh: Кальций алюминий силикаты
-
-        # E570 – Fatty acids
-        "e570",
-        "жирные кислоты",       # Russian: Жирные кислоты
-        "май қышқылдары",       # Kazakh: Май қышқылдары
-
-        # E572 – Magnesium stearate
-        "e572",
-        "стеарат магния",       # Russian: Стеарат магния
-        "магний стеараты",      # Kazakh: Магний стеараты
-
-        # E575 – Glucono delta-lactone
-        "e575",
-        "глюконо-дельта-лактон", # Russian: Глюконо-дельта-лактон
-        "глюконо-дельта-лактон", # Kazakh: Глюконо-дельта-лактон
-
-        # E625 – Magnesium glutamate
-        "e625",
-        "глутамат магния",      # Russian: Глутамат магния
-        "магний глутаматы",     # Kazakh: Магний глутаматы
-
-        # E628 – Potassium guanylate
-        "e628",
-        "гуанилат калия",       # Russian: Гуанилат калия
-        "калий гуанилаты",      # Kazakh: Калий гуанилаты
-
-        # E629 – Calcium guanylate
-        "e629",
-        "гуанилат кальция",     # Russian: Гуанилат кальция
-        "кальций гуанилаты",    # Kazakh: Кальций гуанилаты
-
-        # E630 – Inosine monophosphate
-        "e630",
-        "инозинат натрия",      # Russian: Инозинат натрия
-        "натрий инозинаты",     # Kazakh: Натрий инозинаты
-
-        # E632 – Disodium inosinate
-        "e632",
-        "динатрий инозинат",    # Russian: Динатрий инозинат
-        "динатрий инозинаты",   # Kazakh: Динатрий инозинаты
-
-        # E633 – Calcium inosinate
-        "e633",
-        "инозинат кальция",     # Russian: Инозинат кальция
-        "кальций инозинаты",    # Kazakh: Кальций инозинаты
-
-        # E634 – Calcium 5'-ribonucleotides
-        "e634",
-        "рибонуклеотиды кальция", # Russian: Рибонуклеотиды кальция
-        "кальций рибонуклеотидтері", # Kazakh: Кальций рибонуклеотидтері
-
-        # E641 – L-Leucine
-        "e641",
-        "L-лейцин",             # Russian: L-лейцин
-        "L-лейцин",             # Kazakh: L-лейцин
-
-        # E902 – Candelilla wax
-        "e902",
-        "канделильский воск",   # Russian: Канделильский воск
-        "канделилла балауызы",  # Kazakh: Канделилла балауызы
-
-        # E908 – Rice bran wax
-        "e908",
-        "воск рисовых отрубей", # Russian: Воск рисовых отрубей
-        "күріш кебегі балауызы", # Kazakh: Күріш кебегі балауызы
-
-        # E909 – Oxidized polyethylene wax
-        "e909",
-        "окисленный полиэтиленовый воск", # Russian: Окисленный полиэтиленовый воск
-        "тотығылған полиэтилен балауызы", # Kazakh: Тотығылған полиэтилен балауызы
-
-        # E910 – L-Cysteine
-        "e910",
-        "L-цистеин",            # Russian: L-цистеин
-        "L-цистеин",            # Kazakh: L-цистеин
-
-        # E911 – L-Cysteine hydrochloride
-        "e911",
-        "гидрохлорид L-цистеина", # Russian: Гидрохлорид L-цистеина
-        "L-цистеин гидрохлориді", # Kazakh: L-цистеин гидрохлориді
-
-        # E912 – Montan acid esters
-        "e912",
-        "эфиры монтановых кислот", # Russian: Эфиры монтановых кислот
-        "монтан қышқылдарының эфирлері", # Kazakh: Монтан қышқылдарының эфирлері
-
-        # E913 – Lanolin
-        "e913",
-        "ланолин",                   # Russian
-        "ланолин",                   # Kazakh
-
-        # E914 – Oxidized polyethylene wax
-        "e914",
-        "окисленный полиэтиленовый воск",   # Russian
-        "тотығылған полиэтилен балауызы",   # Kazakh
-
-        # E917 – Potassium iodate
-        "e917",
-        "иодат калия",               # Russian
-        "калий иодаты",              # Kazakh
-
-        # E928 – Benzoyl peroxide
-        "e928",
-        "перекись бензоила",         # Russian
-        "бензол пероксиді",          # Kazakh
-
-        # E930 – Calcium peroxide
-        "e930",
-        "перекись кальция",          # Russian
-        "кальций пероксиді",         # Kazakh
-
-        # E939 – Helium
-        "e939",
-        "гелий",                     # Russian
-        "гелий",                     # Kazakh
-
-        # E941 – Nitrogen
-        "e941",
-        "азот",                      # Russian
-        "азот",                      # Kazakh
-
-        # E943 – Butane
-        "e943",
-        "бутан",                     # Russian
-        "бутан",                     # Kazakh
-
-        # E944 – Propane
-        "e944",
-        "пропан",                    # Russian
-        "пропан",                    # Kazakh
-
-        # E945 – Chloropentafluoroethane
-        "e945",
-        "хлорпентафторэтан",         # Russian
-        "хлорпентафторэтан",         # Kazakh
-
-        # E948 – Oxygen
-        "e948",
-        "кислород",                  # Russian
-        "оттегі",                    # Kazakh
-
-        # E1202 – Polyvinylpyrrolidone (PVP)
-        "e1202",
-        "поливинилпирролидон",       # Russian
-        "поливинилпирролидон",       # Kazakh
-
-        # E1505 – Triethyl citrate
-        "e1505",
-        "триэтилцитрат",             # Russian
-        "триэтил цитраты"           # Kazakh
-    }
-}
-
-# Extract specific ingredient sets
-HARAM_INGREDIENTS = ALL_INGREDIENTS["haram"]
-SUSPECTED_INGREDIENTS = ALL_INGREDIENTS["suspected"]
-
-def check_halal_status(ingredients):
-    found_haram = set()
-    found_suspected = set()
-
-    def matches_exact(element, reference_list):
-        """Check for exact matches (case-insensitive)."""
-        element_lower = element.lower()
-        return any(element_lower == item.lower() for item in reference_list)
-
-    for ingredient in ingredients:
-        ingredient = ' '.join(ingredient.lower().split())  # Normalize whitespace and lowercase
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+# 🟢 Ingredient rules live in rules/ingredients.json, grouped by additive.
+# They are compiled lazily into an IngredientMatcher and hot-reloaded when
+# the file changes (see RuleStore).
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.getenv("RULES_PATH", os.path.join(BASE_DIR, "rules", "ingredients.json"))
+RULES_SNAPSHOT_DIR = os.getenv("RULES_SNAPSHOT_DIR", os.path.join(BASE_DIR, ".rules_cache"))
+RULES_CHECK_INTERVAL = float(os.getenv("RULES_CHECK_INTERVAL", "1.0"))  # seconds between version checks
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "10000"))  # verdicts kept by check_halal_status
+
+HARAM = "haram"
+SUSPECTED = "suspected"
+
+# Fuzzy matching: strings shorter than this are never fuzzy-matched,
+# and the allowed edit distance grows with the length of the string.
+FUZZY_MIN_LENGTH = 5
+FUZZY_LONG_LENGTH = 9
+FUZZY_MEMO_SIZE = 50000
+# Whether /process-images (and reverdict, to reproduce its verdicts) matches fuzzily
+FUZZY_INGREDIENT_MATCH = os.getenv("FUZZY_INGREDIENT_MATCH", "True").lower() == "true"
+
+
+# Script folding for OCR output: Latin lookalikes (a/а, e/е, c/с, o/о, p/р, ...)
+# and Kazakh-specific letters (қ/к, ү/у, ө/о, і/и, ...) map onto one Cyrillic
+# form, so "caxap" and "сахар" are the same key. Applied to the rule vocabulary
+# and to incoming ingredients alike, as a single translate() per string.
+_FOLD_TABLE = str.maketrans({
+    "a": "а", "c": "с", "e": "е", "i": "и", "k": "к", "m": "м", "o": "о", "p": "р", "x": "х", "y": "у",
+    "ё": "е", "і": "и", "ї": "и", "й": "и",
+    "ә": "а", "ғ": "г", "қ": "к", "ң": "н", "ө": "о", "ұ": "у", "ү": "у", "һ": "х",
+})
+# E-number suffixes come out of folding as Cyrillic letters; map them back ("е160а" -> "e160a")
+_UNFOLD_SUFFIX = str.maketrans("асекмориху", "acekmopixy")
+
+
+def normalize_ingredient(text):
+    """Lowercase, fold lookalike letters and collapse whitespace – the form every lookup is keyed by."""
+    return ' '.join(text.lower().translate(_FOLD_TABLE).split())
+
+
+# Tokenizer for raw ingredient text: "Состав: шоколад (какао, эмульгатор E471) 20%, ..."
+_SEPARATORS = set(",;:()[]{}\n•")
+_CLOSING = {"(": ")", "[": "]", "{": "}"}
+# Percentages and quantities: "12%", "2,5 %", "не менее 20 г", "5 мг"
+_QUANTITY_RE = re.compile(
+    r"(?<![^\W_])(?:(?:не\s+)?(?:менее|более)\s+)?\d+(?:[.,]\d+)?\s*"
+    r"(?:%|мкг|мг|гр|г|кг|мл|л|mg|kg|g|ml)(?![^\W\d_])",
+    re.IGNORECASE,
+)
+_LABELS = {"состав", "состав продукта", "құрамы", "ingredients", "содержит"}
+
+
+def _finish_token(chars, tokens):
+    token = _QUANTITY_RE.sub(" ", "".join(chars))
+    token = " ".join(token.split()).strip(" .*-–—")
+    if any(ch.isalpha() for ch in token) and token.lower() not in _LABELS:
+        tokens.append(token)
+
+
+def tokenize_ingredients(text, keep=None):
+    """Split raw ingredient text into a flat list of ingredients in one pass.
+
+    Splits on commas, semicolons, colons and brackets, so nested groups like
+    "шоколад (какао, эмульгатор E471)" flatten into "шоколад", "какао",
+    "эмульгатор E471". Percentages and quantities are dropped, decimal
+    commas ("2,5%") and numeric groups ("полиоксиэтилен (20) стеарат") are
+    not split, and neither are rule terms that contain a separator
+    ("соевое масло, окисленное при нагревании"; keep, by default those of
+    the current rules). A list is tokenized item by item.
+    """
+    if keep is None:
+        keep = current_rules().matcher.atomic_terms
+    if not isinstance(text, str):
+        return [token for item in text for token in tokenize_ingredients(item, keep)]
+
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text  # lower() changed the length (rare letters); positions would not line up
+    tokens = []
+    chars = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        term = next((term for term in keep.get(lowered[i], ()) if lowered.startswith(term, i)), None)
+        if term:
+            chars.append(text[i:i + len(term)])  # a rule term with a separator inside stays whole
+            i += len(term)
+            continue
+        if ch == "," and 0 < i < n - 1 and text[i - 1].isdigit() and text[i + 1].isdigit():
+            chars.append(ch)  # decimal comma
+        elif ch in _CLOSING and (close := text.find(_CLOSING[ch], i)) != -1 and text[i + 1:close].strip().isdigit():
+            chars.append(text[i:close + 1])  # numeric group stays part of the name
+            i = close
+        elif ch in _SEPARATORS:
+            _finish_token(chars, tokens)
+            chars = []
+        else:
+            chars.append(ch)
+        i += 1
+    _finish_token(chars, tokens)
+    return tokens
+
+
+# E-numbers as they show up in OCR and scraped text: "E120", "E 120", "E-120",
+# "Е120" (Cyrillic Е), "E120i", "E1 20". Not preceded by a letter; up to one
+# space between digits; an optional letter suffix ("e160a") right after.
+# Canonical codes are always Latin ("e120"), whatever script the input used.
+_E_NUMBER_RE = re.compile(r"(?<![^\W\d_])[eе][\s-]{0,2}(\d(?:\s?\d){2,3})(?!\d)([a-zа-я](?![^\W\d_]))?")
+_ADDITIVE_CODE_RE = re.compile(r"^e\d{3,4}[a-z]?$")
+
+
+def extract_e_numbers(text):
+    """Yield candidate canonical codes for every E-number in a normalized string.
+
+    Each match yields a tuple of codes to try in order, most specific first:
+    ("e160a", "e160") for "Е-160a", or ("e1501", "e150") for "e150 1", where
+    the OCR could have either split a code or run into a following number.
+    """
+    for match in _E_NUMBER_RE.finditer(text):
+        raw_digits, suffix = match.group(1), (match.group(2) or "").translate(_UNFOLD_SUFFIX)
+        if suffix and not suffix.isascii():
+            suffix = ""
+        digits = "".join(raw_digits.split())
+        codes = [f"e{digits}{suffix}", f"e{digits}"] if suffix else [f"e{digits}"]
+        head = "".join(raw_digits.rsplit(None, 1)[0].split()) if " " in raw_digits else ""
+        if len(head) == 3:
+            codes.append(f"e{head}")
+        yield tuple(codes)
+
+
+def _trigrams(text):
+    """Set of padded character trigrams of a string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_typos(text):
+    """How many edits a string of this length may contain and still fuzzy-match."""
+    if len(text) < FUZZY_MIN_LENGTH or any(ch.isdigit() for ch in text):
+        return 0  # too short, or an E-code / number where one edit means another additive
+    return 1 if len(text) < FUZZY_LONG_LENGTH else 2
+
+
+def _bounded_edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or None once it exceeds limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, so the cost is
+    linear in the string length.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    too_far = limit + 1
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ch_a = a[i - 1]
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= limit else too_far
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1,
+                             current[j - 1] + 1,
+                             previous[j - 1] + (ch_a != b[j - 1]),
+                             too_far)
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def _word_aligned_distance(words, word_limits, term_words):
+    """Total edit distance between two word lists of equal length, each word within its own limit, or None."""
+    if len(words) != len(term_words):
+        return None
+    total = 0
+    for word, limit, term_word in zip(words, word_limits, term_words):
+        if word == term_word:
+            continue
+        distance = _bounded_edit_distance(word, term_word, limit) if limit else None
+        if distance is None:
+            return None
+        total += distance
+    return total
+
+
+# Bump whenever IngredientMatcher's internals change, so stale pickled
+# snapshots in RULES_SNAPSHOT_DIR are rebuilt instead of loaded.
+MATCHER_FORMAT = 3
+
+
+class IngredientMatcher:
+    """Haram/suspected vocabularies compiled into lookup tables.
+
+    Built once per rule set. Exact matches are a single dict lookup, and
+    multi-word haram phrases go through a word → phrase inverted index, so
+    matching one ingredient is one pass over its own words no matter how
+    many rules there are. A trigram index over the same vocabulary
+    shortlists candidates for fuzzy matching. All keys are script-folded
+    (see normalize_ingredient); hits report the rule term as written.
+    """
+
+    def __init__(self, haram, suspected):
+        # Exact lookup: folded term -> (kind, term). Haram wins over suspected.
+        self.exact = {}
+        for kind, items in ((SUSPECTED, suspected), (HARAM, haram)):
+            for item in items:
+                self.exact[normalize_ingredient(item)] = (kind, item.lower())
+
+        # Multi-word haram phrases: all of their words must occur in the ingredient
+        self.phrases = []      # phrase id -> (original term, number of distinct words)
+        self.word_index = {}   # word -> [phrase ids]
+        for item in sorted(haram):
+            words = normalize_ingredient(item).split()
+            if len(words) < 2:
+                continue
+            phrase_id = len(self.phrases)
+            self.phrases.append((item, len(set(words))))
+            for word in set(words):
+                self.word_index.setdefault(word, []).append(phrase_id)
+
+        # Additive codes: canonical Latin code -> (kind, term), e.g. "e120" -> (HARAM, "e120")
+        self.additives = {hit[1]: hit for hit in self.exact.values() if _ADDITIVE_CODE_RE.match(hit[1])}
+
+        # Trigram index for fuzzy candidates: (trigram, term length) -> [term ids].
+        # Keying by length means a query only touches terms it could be within reach of.
+        self.terms = sorted(self.exact)
+        self.term_grams = []
+        self.gram_index = {}
+        for term_id, term in enumerate(self.terms):
+            grams = _trigrams(term)
+            self.term_grams.append(len(grams))
+            for gram in grams:
+                self.gram_index.setdefault((gram, len(term)), []).append(term_id)
+        self.fuzzy_memo = {}  # text -> fuzzy hit or None
+
+        # Terms the tokenizer must not split (they contain a separator), by first letter, longest first
+        self.atomic_terms = {}
+        for item in sorted({item.lower() for item in (*haram, *suspected)}, key=len, reverse=True):
+            if _SEPARATORS & set(item):
+                self.atomic_terms.setdefault(item[0], []).append(item)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["fuzzy_memo"] = {}  # per-process cache, not part of the snapshot
+        return state
+
+    def match(self, ingredient, fuzzy=False):
+        """Return (kind, term, how, score) hits for one normalized ingredient."""
+        hits = []
         words = ingredient.split()
 
-        # Step 1: Check for exact multi-word match in haram list
+        # Step 1: multi-word haram phrases contained in the ingredient
         if len(words) > 1:
-            for haram_item in HARAM_INGREDIENTS:
-                haram_words = haram_item.lower().split()
-                if len(haram_words) > 1 and all(word in words for word in haram_words):
-                    print(f"❌ {ingredient} - ХАРАМ (Matched: {haram_item})")
-                    found_haram.add(haram_item)
-                    break  # No need to check further
-
-        # Step 2: Check exact matches
-        if matches_exact(ingredient, HARAM_INGREDIENTS):
-            print(f"❌ {ingredient} - ХАРАМ (Exact Match)")
-            found_haram.add(ingredient)
-        elif matches_exact(ingredient, SUSPECTED_INGREDIENTS):
-            print(f"⚠️ {ingredient} - ПОДОЗРИТЕЛЬНО (Exact Match)")
-            found_suspected.add(ingredient)
-
-    # Step 3: Final classification
+            counts = {}
+            for word in set(words):
+                for phrase_id in self.word_index.get(word, ()):
+                    counts[phrase_id] = counts.get(phrase_id, 0) + 1
+            for phrase_id, count in counts.items():
+                term, needed = self.phrases[phrase_id]
+                if count == needed:
+                    hits.append((HARAM, term, "phrase", 100))
+
+        # Step 2: exact match
+        exact = self.exact.get(ingredient)
+        if exact:
+            hits.append((exact[0], exact[1], "exact", 100))
+
+        # Step 3: E-numbers anywhere in the ingredient, looked up by canonical code
+        if "e" in ingredient or "е" in ingredient:
+            for codes in extract_e_numbers(ingredient):
+                additive = next((self.additives[code] for code in codes if code in self.additives), None)
+                if additive and not any(hit[1] == additive[1] for hit in hits):
+                    hits.append((additive[0], additive[1], "e-number", 100))
+
+        # Step 4: typo-tolerant match of the whole ingredient and of its words
+        if fuzzy and not hits:
+            for text in [ingredient] + (words if len(words) > 1 else []):
+                if text in self.exact:
+                    continue
+                hit = self.match_fuzzy(text)
+                if hit:
+                    hits.append(hit)
+
+        return hits
+
+    def match_fuzzy(self, text):
+        """Best fuzzy hit for text within the allowed edit distance, or None."""
+        # The same few hundred ingredient strings make up most scans, so
+        # only the first occurrence of a string pays for the search.
+        try:
+            return self.fuzzy_memo[text]
+        except KeyError:
+            pass
+        if len(self.fuzzy_memo) >= FUZZY_MEMO_SIZE:
+            self.fuzzy_memo.clear()
+        hit = self.fuzzy_memo[text] = self._search_fuzzy(text)
+        return hit
+
+    def _search_fuzzy(self, text):
+        # Edits are budgeted per word: "витамин c" must not become "витамин e"
+        # by spending a multi-word allowance on a one-letter word.
+        words = text.split()
+        word_limits = [_max_typos(word) for word in words]
+        limit = sum(word_limits)
+        if not limit:
+            return None
+
+        # Shortlist: a term within `limit` edits shares at least
+        # max(grams) - 3 * limit trigrams with the text (q-gram lemma).
+        grams = _trigrams(text)
+        lengths = range(len(text) - limit, len(text) + limit + 1)
+        shared = Counter(chain.from_iterable(
+            self.gram_index.get((gram, length), ()) for gram in grams for length in lengths
+        ))
+
+        best = None
+        for term_id, count in shared.items():
+            if count < max(len(grams), self.term_grams[term_id]) - 3 * limit:
+                continue
+            term = self.terms[term_id]
+            distance = _word_aligned_distance(words, word_limits, term.split())
+            if distance is None or distance == 0:
+                continue
+            if best is None or distance < best[0]:
+                best = (distance, term)
+
+        if best is None:
+            return None
+        distance, key = best
+        score = round(100 * (1 - distance / max(len(text), len(key))))
+        kind, term = self.exact[key]
+        return kind, term, "fuzzy", score
+
+
+def index_terms(ingredients):
+    """Normalized words and E-codes of an ingredient list.
+
+    Any exact, phrase or E-number rule that matches the list needs all of
+    its own rule_terms() to be among these, which is what lets stored
+    products be looked up by the rules that could affect them.
+    """
+    terms = set()
+    for ingredient in ingredients:
+        ingredient = normalize_ingredient(ingredient)
+        terms.update(ingredient.split())
+        for codes in extract_e_numbers(ingredient):
+            terms.update(codes)
+    return terms
+
+
+def rule_terms(term):
+    """The index_terms() an ingredient list must contain for a rule term to match it."""
+    code = term.strip().lower()
+    return {code} if _ADDITIVE_CODE_RE.match(code) else set(normalize_ingredient(term).split())
+
+
+RuleSet = namedtuple("RuleSet", "version haram suspected matcher")
+
+
+def parse_rules(data):
+    """Parse the rules file into {"haram": set, "suspected": set} of terms."""
+    raw = json.loads(data)
+    return {kind: {term for group in raw.get(kind, []) for term in group["terms"]}
+            for kind in (HARAM, SUSPECTED)}
+
+
+class RuleStore:
+    """Versioned ingredient rules backed by a JSON file, reloaded without a restart.
+
+    The file is only read on first use. After that, at most once every
+    check_interval seconds a request stats the file; if it changed, its
+    content hash becomes the new version and a matcher for that version is
+    swapped in atomically. Compiled matchers are pickled to snapshot_dir
+    under their version, so each version is built once, not once per worker.
+    """
+
+    def __init__(self, path, snapshot_dir=None, check_interval=1.0):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._current = None
+        self._stat = None
+        self._next_check = 0.0
+
+    def current(self):
+        """Return the current RuleSet, reloading it first if the file changed."""
+        current = self._current
+        if current is not None and time.monotonic() < self._next_check:
+            return current
+
+        with self._lock:
+            if self._current is not None and time.monotonic() < self._next_check:
+                return self._current
+            try:
+                self._refresh()
+            except Exception as e:
+                if self._current is None:
+                    raise
+                print(f"⚠️ Не удалось перезагрузить правила {self.path}: {e}")  # keep serving the old version
+            self._next_check = time.monotonic() + self.check_interval
+            return self._current
+
+    def _refresh(self):
+        stat = os.stat(self.path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if self._current is not None and stat_key == self._stat:
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        version = hashlib.sha256(data).hexdigest()[:12]
+        if self._current is None or version != self._current.version:
+            rules = parse_rules(data)
+            matcher = self._load_or_build(version, rules)
+            self._current = RuleSet(version, rules[HARAM], rules[SUSPECTED], matcher)
+            print(f"🔄 Правила загружены: версия {version}")
+        self._stat = stat_key
+
+    def _snapshot_path(self, version):
+        return os.path.join(self.snapshot_dir, f"matcher-v{MATCHER_FORMAT}-{version}.pickle")
+
+    def _load_or_build(self, version, rules):
+        if self.snapshot_dir:
+            try:
+                with open(self._snapshot_path(version), "rb") as f:
+                    return pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+
+        matcher = IngredientMatcher(rules[HARAM], rules[SUSPECTED])
+
+        if self.snapshot_dir:
+            try:
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._snapshot_path(version))
+            except OSError as e:
+                print(f"⚠️ Не удалось сохранить снимок правил: {e}")
+        return matcher
+
+
+_RULES = RuleStore(RULES_PATH, RULES_SNAPSHOT_DIR, RULES_CHECK_INTERVAL)
+
+
+def current_rules():
+    """The RuleSet currently in effect (version, haram, suspected, matcher)."""
+    return _RULES.current()
+
+
+def __getattr__(name):
+    """Rule vocabularies as module attributes, loaded on first access."""
+    if name == "ALL_INGREDIENTS":
+        rules = current_rules()
+        return {HARAM: rules.haram, SUSPECTED: rules.suspected}
+    if name == "HARAM_INGREDIENTS":
+        return current_rules().haram
+    if name == "SUSPECTED_INGREDIENTS":
+        return current_rules().suspected
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _verdict(found_haram, found_suspected, fuzzy_matches, fuzzy):
+    """Turn the collected hits into the status dict returned to callers (found terms sorted, so stored text is stable)."""
     if found_haram:
-        return {"status": "таза емес", "found_ingredients": list(found_haram)}
+        result = {"status": "таза емес", "found_ingredients": sorted(found_haram)}
     elif found_suspected:
-        return {"status": "күмәнді", "found_ingredients": list(found_suspected)}
+        result = {"status": "күмәнді", "found_ingredients": sorted(found_suspected)}
     else:
-        return {"status": "таза", "found_ingredients": []}
+        result = {"status": "таза", "found_ingredients": []}
+
+    if fuzzy:
+        result["fuzzy_matches"] = fuzzy_matches
+    return result
+
+
+class VerdictCache:
+    """Bounded LRU of verdicts keyed by a canonical hash of the ingredient set.
+
+    Entries are only valid for the rule version they were computed with;
+    the first lookup under a new version drops everything.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(ingredients, fuzzy):
+        """Hash of the normalized, order-insensitive ingredient set."""
+        canonical = "\x1f".join(sorted(set(ingredients)))
+        return hashlib.sha1(f"{int(fuzzy)}\x1e{canonical}".encode("utf-8")).hexdigest()
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_verdict(verdict)
+
+    def put(self, key, version, verdict):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return  # rules changed while this verdict was being computed
+            self._entries[key] = _copy_verdict(verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "rules_version": self.version,
+            }
+
+
+def _copy_verdict(verdict):
+    copy = dict(verdict)
+    copy["found_ingredients"] = list(verdict["found_ingredients"])
+    if "fuzzy_matches" in verdict:
+        copy["fuzzy_matches"] = [dict(m) for m in verdict["fuzzy_matches"]]
+    return copy
+
+
+_VERDICT_CACHE = VerdictCache(VERDICT_CACHE_SIZE)
+
+
+def verdict_cache_stats():
+    """Size, hit/miss counters and rule version of the check_halal_status cache."""
+    return _VERDICT_CACHE.stats()
+
+
+def check_halal_status(ingredients, fuzzy=False):
+    if isinstance(ingredients, str):
+        ingredients = tokenize_ingredients(ingredients)
+    ingredients = [normalize_ingredient(ingredient) for ingredient in ingredients]
+
+    # Popular products are scanned over and over: reuse the verdict for the same ingredient set
+    rules = current_rules()
+    cache_key = VerdictCache.key(ingredients, fuzzy)
+    cached = _VERDICT_CACHE.get(cache_key, rules.version)
+    if cached is not None:
+        return cached
+
+    matcher = rules.matcher
+    found_haram = set()
+    found_suspected = set()
+    fuzzy_matches = []
+
+    for ingredient in ingredients:
+        for kind, term, how, score in matcher.match(ingredient, fuzzy=fuzzy):
+            if how == "fuzzy":
+                fuzzy_matches.append({"ingredient": ingredient, "matched": term, "score": score})
+            if kind == HARAM:
+                print(f"❌ {ingredient} - ХАРАМ (Matched: {term}, {how} {score}%)")
+                found_haram.add(term)
+            else:
+                print(f"⚠️ {ingredient} - ПОДОЗРИТЕЛЬНО (Matched: {term}, {how} {score}%)")
+                found_suspected.add(term)
+
+    verdict = _verdict(found_haram, found_suspected, fuzzy_matches, fuzzy)
+    _VERDICT_CACHE.put(cache_key, rules.version, verdict)
+    return verdict
+
+
+def _iter_verdicts(products, fuzzy, matcher=None):
+    """Verdicts for an iterable of ingredient lists, matching each distinct string once."""
+    matcher = matcher or current_rules().matcher
+    seen = {}  # raw ingredient string -> (normalized, hits)
+    for ingredients in products:
+        if isinstance(ingredients, str):
+            ingredients = tokenize_ingredients(ingredients, matcher.atomic_terms)
+        found_haram = set()
+        found_suspected = set()
+        fuzzy_matches = []
+
+        for raw in ingredients:
+            cached = seen.get(raw)
+            if cached is None:
+                ingredient = normalize_ingredient(raw)
+                cached = seen[raw] = (ingredient, matcher.match(ingredient, fuzzy=fuzzy))
+            ingredient, hits = cached
+
+            for kind, term, how, score in hits:
+                if how == "fuzzy":
+                    fuzzy_matches.append({"ingredient": ingredient, "matched": term, "score": score})
+                (found_haram if kind == HARAM else found_suspected).add(term)
+
+        yield _verdict(found_haram, found_suspected, fuzzy_matches, fuzzy)
+
+
+_worker_matcher = None  # set once per pool worker by _init_worker
+
+
+def _init_worker(matcher):
+    """Process-pool initializer: receive the matcher once instead of with every chunk."""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _check_chunk(products, fuzzy):
+    """Process-pool worker: verdicts for one chunk of products."""
+    return list(_iter_verdicts(products, fuzzy, _worker_matcher))
+
+
+def check_halal_status_many(products, fuzzy=False, processes=1, chunk_size=500, matcher=None):
+    """Check many ingredient lists at once, yielding one verdict per list in order.
+
+    Each item is a list of ingredients or raw ingredient text. Ingredient
+    strings repeated across the batch ("вода", "сахар") are
+    normalized and matched only once, and nothing is printed per match.
+    With processes > 1 (or 0 for every core) the input is split into chunks
+    of chunk_size lists and checked on a process pool; only a few chunks
+    are in flight at a time, so verdicts still stream back. Pass matcher to
+    check against a rule set other than the live one.
+    """
+    if processes == 1:
+        yield from _iter_verdicts(products, fuzzy, matcher)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    chunks = iter(lambda it=iter(products): list(islice(it, chunk_size)), [])
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(matcher,)) as pool:
+        pending = deque(pool.submit(_check_chunk, chunk, fuzzy) for chunk in islice(chunks, processes * 2))
+        while pending:
+            verdicts = pending.popleft().result()
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                pending.append(pool.submit(_check_chunk, next_chunk, fuzzy))
+            yield from verdicts
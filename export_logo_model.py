@@ -0,0 +1,100 @@
+"""Export the logo detector to ONNX for the onnxruntime backend (LOGO_BACKEND=onnx).
+
+    python export_logo_model.py                    # .model_cache/best.onnx
+    python export_logo_model.py --int8             # + static INT8, calibrated on QuramDetect-2/valid
+
+The graph is exported with a dynamic batch axis so batched requests run as
+one forward pass. INT8 uses onnxruntime static quantization (QDQ, per-channel
+weights) with activation ranges calibrated on the validation images, fed
+through the same letterbox as at inference. A .sha256 file is written next to
+every output; the server verifies it on load.
+"""
+import argparse
+import os
+import shutil
+
+from PIL import Image
+
+from logo_model import LOGO_IMGSZ, LOGO_ONNX_PATH, letterbox, logo_model, write_checksum
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CALIBRATION_DIR = os.path.join(BASE_DIR, "QuramDetect-2", "valid", "images")
+
+
+def export_onnx(weights, output, imgsz=LOGO_IMGSZ, opset=17):
+    from ultralytics import YOLO
+
+    exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True, opset=opset)
+    if os.path.abspath(exported) != os.path.abspath(output):
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        shutil.move(exported, output)
+    return output
+
+
+class ValidationImageReader:
+    """onnxruntime CalibrationDataReader over a directory of images."""
+
+    def __init__(self, image_dir, input_name, limit=None):
+        files = sorted(f for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        self.paths = [os.path.join(image_dir, f) for f in files[:limit]]
+        self.input_name = input_name
+        self._iter = iter(self.paths)
+
+    def get_next(self):
+        path = next(self._iter, None)
+        if path is None:
+            return None
+        with Image.open(path) as image:
+            array, _, _ = letterbox(image)
+        return {self.input_name: array[None]}
+
+    def rewind(self):
+        self._iter = iter(self.paths)
+
+
+def quantize_int8(model_path, output, calibration_dir=CALIBRATION_DIR, limit=None):
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared = f"{output}.prep.onnx"
+    quant_pre_process(model_path, prepared)
+    input_name = ort.InferenceSession(prepared, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    reader = ValidationImageReader(calibration_dir, input_name, limit)
+    print(f"Калибровка INT8 на {len(reader.paths)} изображениях из {calibration_dir}")
+    try:
+        quantize_static(prepared, output, reader,
+                        quant_format=QuantFormat.QDQ,
+                        per_channel=True,
+                        activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8,
+                        calibrate_method=CalibrationMethod.MinMax)
+    finally:
+        os.remove(prepared)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", help="YOLO .pt weights (default: the verified LOGO_MODEL_PATH cache)")
+    parser.add_argument("--output", default=LOGO_ONNX_PATH, help="ONNX file to write")
+    parser.add_argument("--imgsz", type=int, default=LOGO_IMGSZ)
+    parser.add_argument("--int8", action="store_true", help="also write an INT8-quantized model")
+    parser.add_argument("--int8-output", help="INT8 model path (default: <output>-int8.onnx)")
+    parser.add_argument("--calibration-dir", default=CALIBRATION_DIR)
+    parser.add_argument("--calibration-limit", type=int, help="use at most this many calibration images")
+    args = parser.parse_args()
+
+    weights = args.weights or logo_model.ensure_weights()
+    output = export_onnx(weights, args.output, args.imgsz)
+    print(f"ONNX: {output} (sha256 {write_checksum(output)})")
+
+    if args.int8:
+        int8_output = args.int8_output or f"{os.path.splitext(output)[0]}-int8.onnx"
+        quantize_int8(output, int8_output, args.calibration_dir, args.calibration_limit)
+        print(f"ONNX INT8: {int8_output} (sha256 {write_checksum(int8_output)})")
+        print(f"Для сервера: LOGO_BACKEND=onnx LOGO_ONNX_PATH={int8_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,16 @@ def upload_to_gcs(file):
     blob.make_public()
     return blob.public_url
 
+# 📤 Загрузка уже прочитанных байтов (без повторного чтения файла и временных файлов)
+def upload_bytes_to_gcs(data, filename, content_type=None):
+    client = get_gcs_client()
+    bucket = client.bucket(BUCKET_NAME)
+    blob_name = f"{uuid.uuid4().hex}_{filename}"
+    blob = bucket.blob(blob_name)
+    blob.upload_from_string(data, content_type=content_type)
+    blob.make_public()
+    return blob.public_url
+
 # 📌 Эндпоинт загрузки изображения к Product
 @gcs_routes.route('/upload_product_image', methods=['POST'])
 def upload_product_image():
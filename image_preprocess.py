@@ -0,0 +1,59 @@
+import io
+import os
+
+from PIL import Image, ImageOps
+
+# Подготовка фото перед OCR и загрузкой в GCS: снимки с телефона приходят по
+# 12+ Мп, а для чтения состава хватает ~2000 px по длинной стороне.
+# Поворот по EXIF, уменьшение (для JPEG – сразу при декодировании через draft),
+# перекодирование в JPEG/WebP, по желанию – в оттенки серого.
+
+IMAGE_PREPROCESS = os.getenv("IMAGE_PREPROCESS", "True").lower() == "true"
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "2048"))  # px, long edge; small label text stays legible
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()  # JPEG or WEBP
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "False").lower() == "true"
+
+_CONTENT_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+
+
+def preprocess_image(data, filename, content_type):
+    """Orient, downscale and recompress an uploaded photo.
+
+    Returns (data, filename, content_type, stats). The original bytes come
+    back unchanged when preprocessing is off, the image can't be decoded,
+    or it needed no rotation or resizing and re-encoding would not make it smaller.
+    """
+    stats = {"original_bytes": len(data), "processed_bytes": len(data), "bytes_saved": 0, "size": None}
+    if not IMAGE_PREPROCESS:
+        return data, filename, content_type, stats
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            mode = "L" if IMAGE_GRAYSCALE else "RGB"
+            original_size = img.size
+            rotated = img.getexif().get(0x0112, 1) != 1  # EXIF Orientation
+            # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale, never below the target size
+            img.draft(mode, (IMAGE_MAX_EDGE, IMAGE_MAX_EDGE))
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE), Image.LANCZOS)
+            if img.mode != mode:
+                img = img.convert(mode)
+
+            out = io.BytesIO()
+            img.save(out, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True)
+            stats["size"] = img.size
+            reshaped = rotated or img.size != original_size
+    except Exception as e:
+        print(f"⚠️ Предобработка изображения пропущена: {e}")
+        return data, filename, content_type, stats
+
+    processed = out.getvalue()
+    if len(processed) >= len(data) and not reshaped:
+        return data, filename, content_type, stats
+
+    stats["processed_bytes"] = len(processed)
+    stats["bytes_saved"] = len(data) - len(processed)  # negative if only a rotation made it bigger
+    filename = f"{filename.rsplit('.', 1)[0]}.{_EXTENSIONS[IMAGE_FORMAT]}"
+    return processed, filename, _CONTENT_TYPES[IMAGE_FORMAT], stats
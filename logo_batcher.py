@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+from logo_model import logo_model
+
+# Микробатчинг для /process-logo: одновременные запросы разных пользователей
+# складываются в очередь, и один поток прогоняет их через модель одним батчем –
+# как только набралось LOGO_MICROBATCH_MAX_SIZE изображений или первое ждёт
+# LOGO_MICROBATCH_MAX_WAIT_MS. Каждый вызывающий получает свой результат через Future.
+
+LOGO_MICROBATCH = os.getenv("LOGO_MICROBATCH", "True").lower() == "true"
+LOGO_MICROBATCH_MAX_SIZE = int(os.getenv("LOGO_MICROBATCH_MAX_SIZE", "8"))
+LOGO_MICROBATCH_MAX_WAIT_MS = float(os.getenv("LOGO_MICROBATCH_MAX_WAIT_MS", "5"))
+LATENCY_SAMPLES = 1000  # recent batches kept for the wait/inference percentiles
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 2)}
+
+
+class LogoBatcher:
+    """Queues single-image detect() calls and runs them through the detector in shared batches."""
+
+    def __init__(self, get_detector, max_size, max_wait_ms):
+        self.get_detector = get_detector
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = deque()  # (image, conf, future, enqueued_at)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._batch_sizes = Counter()
+        self._waits_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._inference_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._images = 0
+        self._errors = 0
+
+    def _ensure_worker(self):
+        # Started on first use, and again in a forked worker process (threads don't survive fork)
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="logo-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, image, conf):
+        """Future resolving to the image's detections (confidence >= conf)."""
+        future = Future()
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append((image, conf, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def detect(self, image, conf):
+        """Detections for one image, computed in a batch shared with concurrent callers."""
+        return self.submit(image, conf).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0][3] + self.max_wait
+            while len(self._queue) < self.max_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_size, len(self._queue)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            try:
+                # One pass at the lowest requested threshold; each caller's own threshold is applied below
+                results = self.get_detector().detect([image for image, _, _, _ in batch],
+                                                     conf=min(conf for _, conf, _, _ in batch))
+            except Exception as e:
+                self._errors += 1
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            for (_, conf, future, _), detections in zip(batch, results):
+                future.set_result([detection for detection in detections if detection.confidence >= conf])
+
+            self._batch_sizes[len(batch)] += 1
+            self._images += len(batch)
+            self._waits_ms.extend((started - enqueued_at) * 1000 for _, _, _, enqueued_at in batch)
+            self._inference_ms.append((finished - started) * 1000)
+
+    def stats(self):
+        batches = sum(self._batch_sizes.values())
+        return {
+            "enabled": LOGO_MICROBATCH,
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": len(self._queue),
+            "batches": batches,
+            "images": self._images,
+            "errors": self._errors,
+            "mean_batch_size": round(self._images / batches, 2) if batches else None,
+            "batch_size_histogram": {str(size): n for size, n in sorted(self._batch_sizes.items())},
+            "queue_wait_ms": _percentiles(list(self._waits_ms)),
+            "inference_ms": _percentiles(list(self._inference_ms)),
+        }
+
+
+logo_batcher = LogoBatcher(logo_model.get, LOGO_MICROBATCH_MAX_SIZE, LOGO_MICROBATCH_MAX_WAIT_MS)
@@ -0,0 +1,341 @@
+import ast
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import namedtuple
+
+import click
+import numpy as np
+import requests
+from PIL import Image
+
+# Модель распознавания логотипов (YOLOv8). Веса скачиваются один раз в локальный
+# кэш и проверяются по закреплённому sha256 (LOGO_MODEL_SHA256 или logo_model.sha256
+# в репозитории); без него веса не загружаются. загрузка и прогрев выполняются при старте воркера,
+# а не на первом запросе, и только одним потоком (single-flight).
+#
+# Бэкенды (LOGO_BACKEND):
+#   torch – ultralytics + PyTorch, веса best.pt;
+#   onnx  – onnxruntime на CPU, модель из export_logo_model.py (в т.ч. INT8), свой NMS.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGO_MODEL_URL = os.getenv("LOGO_MODEL_URL", "https://storage.googleapis.com/quram_product_photo/best.pt")
+LOGO_MODEL_PATH = os.getenv("LOGO_MODEL_PATH", os.path.join(BASE_DIR, ".model_cache", "best.pt"))
+LOGO_MODEL_PIN_PATH = os.path.join(BASE_DIR, "logo_model.sha256")  # committed checksum of the weights at LOGO_MODEL_URL
+LOGO_MODEL_SHA256 = os.getenv("LOGO_MODEL_SHA256", "").lower()  # overrides the committed checksum
+LOGO_MODEL_EAGER = os.getenv("LOGO_MODEL_EAGER", "True").lower() == "true"  # load at worker start
+LOGO_MODEL_RETRY_S = float(os.getenv("LOGO_MODEL_RETRY_S", "30"))  # first retry delay after a failed load, doubles up to 10 min
+LOGO_BACKEND = os.getenv("LOGO_BACKEND", "torch").lower()  # torch or onnx
+LOGO_ONNX_PATH = os.getenv("LOGO_ONNX_PATH", os.path.join(BASE_DIR, ".model_cache", "best.onnx"))
+LOGO_ONNX_THREADS = int(os.getenv("LOGO_ONNX_THREADS", "0"))  # intra-op threads; 0 = onnxruntime default
+LOGO_IMGSZ = int(os.getenv("LOGO_IMGSZ", "640"))
+LOGO_CONF = float(os.getenv("LOGO_CONF", "0.25"))
+LOGO_IOU = float(os.getenv("LOGO_IOU", "0.45"))
+LOGO_MAX_DETECTIONS = 100
+
+# Box is (x1, y1, x2, y2) in pixels of the original image
+Detection = namedtuple("Detection", "name confidence box")
+
+
+class LogoModelUnavailable(RuntimeError):
+    """The detector failed to load and the next attempt is not due yet."""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_checksum(path):
+    """Record path's sha256 next to it (path.sha256), for verification at load."""
+    checksum = _sha256(path)
+    with open(f"{path}.sha256", "w") as f:
+        f.write(checksum)
+    return checksum
+
+
+def decode_image(data):
+    """Upload bytes -> (RGB PIL image, factor from its pixels back to the original's).
+
+    JPEGs are decoded by libjpeg at 1/2, 1/4 or 1/8 scale when the result is
+    still at least LOGO_IMGSZ on each side, since letterbox shrinks it to that anyway.
+    """
+    image = Image.open(io.BytesIO(data))
+    original_width = image.width
+    image.draft("RGB", (LOGO_IMGSZ, LOGO_IMGSZ))
+    image = image.convert("RGB")
+    return image, original_width / image.width
+
+
+def letterbox(image, size=LOGO_IMGSZ):
+    """RGB image -> (float32 CHW array in [0, 1], scale, (pad_x, pad_y)), as ultralytics preprocesses it."""
+    image = image.convert("RGB")
+    scale = min(size / image.width, size / image.height)
+    width, height = round(image.width * scale), round(image.height * scale)
+    pad_x, pad_y = (size - width) // 2, (size - height) // 2
+    canvas = Image.new("RGB", (size, size), (114, 114, 114))
+    canvas.paste(image.resize((width, height), Image.BILINEAR), (pad_x, pad_y))
+    array = np.asarray(canvas, dtype=np.float32).transpose(2, 0, 1) / 255.0
+    return array, scale, (pad_x, pad_y)
+
+
+def nms(boxes, scores, iou_threshold):
+    """Indices kept by greedy non-maximum suppression, best first."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+class TorchLogoDetector:
+    """ultralytics YOLO on PyTorch."""
+
+    backend = "torch"
+
+    def __init__(self, path):
+        from ultralytics import YOLO
+
+        self.model = YOLO(path)
+        self.model.model.fuse = lambda *args, **kwargs: self.model.model  # Disable fuse if needed
+        self.names = {int(i): name.lower() for i, name in self.model.names.items()}
+
+    def detect(self, images, conf=LOGO_CONF):
+        """Detections for each PIL image, in input order."""
+        results = self.model.predict(list(images), conf=conf, iou=LOGO_IOU, imgsz=LOGO_IMGSZ, verbose=False)
+        return [
+            [Detection(self.names[int(cls_id)], float(score), tuple(box))
+             for box, score, cls_id in zip(r.boxes.xyxy.tolist(), r.boxes.conf.tolist(), r.boxes.cls.tolist())]
+            for r in results
+        ]
+
+
+class OnnxLogoDetector:
+    """The exported YOLOv8 graph on onnxruntime (CPU), with letterboxing and NMS done here."""
+
+    backend = "onnx"
+
+    def __init__(self, path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if LOGO_ONNX_THREADS:
+            options.intra_op_num_threads = LOGO_ONNX_THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        # ultralytics stores class names in the ONNX metadata as a dict literal
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = {int(i): name.lower() for i, name in ast.literal_eval(metadata["names"]).items()}
+
+    def _run(self, batch):
+        if self.fixed_batch and len(batch) != self.fixed_batch:
+            return np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                                   for i in range(len(batch))])
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def detect(self, images, conf=LOGO_CONF):
+        """Detections for each PIL image, in input order."""
+        images = list(images)
+        if not images:
+            return []
+        prepared = [letterbox(image) for image in images]
+        output = self._run(np.stack([array for array, _, _ in prepared]))  # (N, 4 + classes, anchors)
+
+        detections = []
+        for image, (_, scale, (pad_x, pad_y)), prediction in zip(images, prepared, output):
+            prediction = prediction.T  # (anchors, 4 + classes)
+            class_scores = prediction[:, 4:]
+            class_ids = class_scores.argmax(axis=1)
+            scores = class_scores[np.arange(len(class_ids)), class_ids]
+            mask = scores >= conf
+            if not mask.any():
+                detections.append([])
+                continue
+            cx, cy, w, h = prediction[mask, :4].T
+            boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+            scores, class_ids = scores[mask], class_ids[mask]
+
+            # Class-aware NMS: shift each class into its own coordinate range
+            keep = nms(boxes + class_ids[:, None] * (LOGO_IMGSZ + 1), scores, LOGO_IOU)[:LOGO_MAX_DETECTIONS]
+            boxes = (boxes[keep] - [pad_x, pad_y, pad_x, pad_y]) / scale
+            boxes = boxes.clip(0, [image.width, image.height, image.width, image.height])
+            detections.append([
+                Detection(self.names[int(cls_id)], float(score), tuple(float(v) for v in box))
+                for box, score, cls_id in zip(boxes, scores[keep], class_ids[keep])
+            ])
+        return detections
+
+
+class LogoModelManager:
+    """Loads the logo detector once per process from a checksum-verified local copy of the weights."""
+
+    def __init__(self, url, path, sha256="", backend="torch", onnx_path=None, pin_path=LOGO_MODEL_PIN_PATH):
+        self.url = url
+        self.path = path
+        self.sha256 = sha256
+        self.backend = backend
+        self.onnx_path = onnx_path
+        self.pin_path = pin_path
+        self.model = None
+        self.error = None
+        self.load_seconds = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_checksum(self, path):
+        try:
+            with open(path) as f:
+                return f.read().split()[0].lower()  # also accepts `sha256sum` output
+        except (OSError, IndexError):
+            return None
+
+    def pinned_checksum(self):
+        """Expected sha256 of the .pt weights; raises if none is pinned, so unverified weights never load."""
+        checksum = self.sha256 or self._read_checksum(self.pin_path)
+        if not checksum:
+            raise ValueError(f"no pinned checksum for {self.url}: set LOGO_MODEL_SHA256 or commit {self.pin_path}")
+        return checksum
+
+    def fetch(self, tmp_path):
+        """Download the weights to tmp_path; returns their sha256.
+
+        Checks the object MD5 that Cloud Storage reports (x-goog-hash), so a
+        truncated or corrupted transfer is rejected even before it is pinned.
+        """
+        print(f"⬇️ Скачиваем модель логотипов: {self.url}")
+        os.makedirs(os.path.dirname(os.path.abspath(tmp_path)), exist_ok=True)
+        sha256, md5 = hashlib.sha256(), hashlib.md5()
+        with requests.get(self.url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            server_hashes = dict(part.strip().split("=", 1) for part in
+                                 response.headers.get("x-goog-hash", "").split(",") if "=" in part)
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(1 << 20):
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    md5.update(chunk)
+        server_md5 = server_hashes.get("md5")
+        if server_md5 and base64.b64decode(server_md5) != md5.digest():
+            raise ValueError(f"MD5 mismatch for {self.url}: download corrupted")
+        return sha256.hexdigest()
+
+    def _download(self, expected):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.part"
+        try:
+            checksum = self.fetch(tmp_path)
+            if checksum != expected:
+                raise ValueError(f"checksum mismatch for {self.url}: {checksum} != {expected}")
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def ensure_weights(self):
+        """Path to verified local .pt weights, downloading them if missing or corrupt."""
+        expected = self.pinned_checksum()
+        if os.path.exists(self.path) and _sha256(self.path) == expected:
+            return self.path
+        self._download(expected)
+        return self.path
+
+    def _build(self):
+        if self.backend == "onnx":
+            if os.path.exists(self.onnx_path):
+                # Written by export_logo_model.py from the verified .pt weights
+                expected = self._read_checksum(f"{self.onnx_path}.sha256")
+                if expected and _sha256(self.onnx_path) != expected:
+                    raise ValueError(f"checksum mismatch for {self.onnx_path}")
+                return OnnxLogoDetector(self.onnx_path)
+            print(f"⚠️ {self.onnx_path} не найден (см. export_logo_model.py), используем torch")
+        return TorchLogoDetector(self.ensure_weights())
+
+    def warm_up(self, model):
+        """One dummy inference so lazy initialization isn't paid by the first request."""
+        model.detect([Image.new("RGB", (LOGO_IMGSZ, LOGO_IMGSZ))])
+
+    def get(self):
+        """The loaded detector; concurrent first callers wait for a single load.
+
+        After a failed load, raises LogoModelUnavailable without retrying
+        until the backoff (LOGO_MODEL_RETRY_S, doubling) has passed.
+        """
+        if self.model is not None:
+            return self.model
+        if time.monotonic() < self.retry_at:
+            raise LogoModelUnavailable(self.error)
+        with self._lock:
+            if self.model is None:
+                if time.monotonic() < self.retry_at:
+                    raise LogoModelUnavailable(self.error)  # the load we waited for just failed
+                start = time.perf_counter()
+                try:
+                    model = self._build()
+                    self.warm_up(model)
+                except Exception as e:
+                    self.error = str(e)
+                    self.failures += 1
+                    self.retry_at = time.monotonic() + min(LOGO_MODEL_RETRY_S * 2 ** (self.failures - 1), 600)
+                    raise LogoModelUnavailable(self.error) from e
+                self.model, self.error, self.failures, self.retry_at = model, None, 0, 0.0
+                self.load_seconds = round(time.perf_counter() - start, 2)
+                print(f"✅ Модель логотипов ({model.backend}) загружена за {self.load_seconds} с")
+        return self.model
+
+    def preload(self):
+        """Start loading in a background thread (worker start); requests arriving meanwhile wait in get()."""
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"❌ Не удалось загрузить модель логотипов: {e}")
+
+        threading.Thread(target=run, name="logo-model-preload", daemon=True).start()
+
+    def status(self):
+        return {
+            "loaded": self.model is not None,
+            "backend": self.model.backend if self.model is not None else self.backend,
+            "path": self.onnx_path if self.model is not None and self.model.backend == "onnx" else self.path,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+            "failures": self.failures,
+            "retry_in_s": round(max(0.0, self.retry_at - time.monotonic()), 1) if self.retry_at else None,
+        }
+
+
+logo_model = LogoModelManager(LOGO_MODEL_URL, LOGO_MODEL_PATH, LOGO_MODEL_SHA256, LOGO_BACKEND, LOGO_ONNX_PATH)
+
+
+@click.command("pin-logo-model")
+@click.option("--output", default=LOGO_MODEL_PIN_PATH, show_default=True, help="Checksum file to write (commit it).")
+def pin_logo_model_command(output):
+    """Download the logo weights from LOGO_MODEL_URL and record their sha256 as the pinned checksum."""
+    tmp_path = os.path.join(os.path.dirname(LOGO_MODEL_PATH), f"pin.{os.getpid()}.part")
+    try:
+        checksum = logo_model.fetch(tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(output, "w") as f:
+        f.write(f"{checksum}  {os.path.basename(LOGO_MODEL_URL)}\n")
+    click.echo(f"{checksum} -> {output}")
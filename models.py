@@ -104,3 +104,19 @@ class BaseModel(db.Model):
 
 
 
+
+# Инвертированный индекс: слово / E-код состава -> продукт или скан (для пересчёта статусов)
+class IngredientIndex(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    term = db.Column(db.String(255), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), nullable=True, index=True)
+    scan_history_id = db.Column(db.Integer, db.ForeignKey('scan_history.id', ondelete='CASCADE'), nullable=True, index=True)
+
+
+# Фоновое сканирование: /scan-jobs принимает фото сразу, конвейер выполняется в пуле потоков
+class ScanJob(BaseModel):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, error
+    result = db.Column(db.Text, nullable=True)  # JSON с данными как у /process-images
+    error = db.Column(db.Text, nullable=True)
+    scan_history_id = db.Column(db.Integer, db.ForeignKey('scan_history.id'), nullable=True)
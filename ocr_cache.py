@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from PIL import Image
+
+# Кэш результатов OCR для /process-images: одно и то же фото упаковки
+# (или почти такое же – пересжатое, чуть другой кадр) не отправляется в
+# Gemini повторно. Ключ – sha256 байтов; при промахе (если включено) ищем
+# ближайший dHash и подтверждаем его размером кадра и подробным 256-битным dHash:
+# разные вкусы одной упаковки отличаются на 64-битном dHash всего на пару бит.
+
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "2000"))  # images kept
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+OCR_CACHE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_MAX_DISTANCE", "-1"))  # dHash bits of 64; -1 disables near-duplicates
+OCR_CACHE_CONFIRM_DISTANCE = int(os.getenv("OCR_CACHE_CONFIRM_DISTANCE", "6"))  # 256-bit dHash bits a near hit may differ by
+
+ImageKey = namedtuple("ImageKey", "digest phash size fine")  # fine: 256-bit dHash confirming a near hit
+_Entry = namedtuple("_Entry", "ingredients phash size fine expires")
+
+
+def _dhash_bits(gray, size):
+    pixels = list(gray.resize((size + 1, size), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def _perceptual_keys(data):
+    """(64-bit dHash, (width, height), 256-bit dHash) of an image, or Nones if it can't be decoded."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            size = img.size
+            img.draft("L", (128, 128))  # JPEG: decode at reduced scale, much cheaper
+            gray = img.convert("L")
+            return _dhash_bits(gray, 8), size, _dhash_bits(gray, 16)
+    except Exception:
+        return None, None, None
+
+
+def image_key(data):
+    """Exact and perceptual keys for raw image bytes."""
+    digest = hashlib.sha256(data).hexdigest()
+    if OCR_CACHE_MAX_DISTANCE < 0:
+        return ImageKey(digest, None, None, None)
+    return ImageKey(digest, *_perceptual_keys(data))
+
+
+class OcrCache:
+    """Bounded LRU of extracted ingredient lists with a TTL per entry.
+
+    Lookups try the exact content hash first, then the closest stored
+    dHash within max_distance bits. A near hit only counts if the image has
+    the same dimensions and its 256-bit dHash is within confirm_distance bits.
+    """
+
+    def __init__(self, maxsize, ttl, max_distance, confirm_distance=OCR_CACHE_CONFIRM_DISTANCE):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.confirm_distance = confirm_distance
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(ingredients, "exact" | "near") for a cached image, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key.digest)
+            if entry is not None and entry.expires <= now:
+                del self._entries[key.digest]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key.digest)
+                self.hits += 1
+                return list(entry.ingredients), "exact"
+
+            digest = self._nearest(key, now)
+            if digest is not None:
+                self._entries.move_to_end(digest)
+                self.near_hits += 1
+                return list(self._entries[digest].ingredients), "near"
+
+            self.misses += 1
+            return None
+
+    def _nearest(self, key, now):
+        if key.phash is None or self.max_distance < 0:
+            return None
+        best, best_distance = None, self.max_distance + 1
+        for digest, entry in self._entries.items():
+            if entry.phash is None or entry.expires <= now or entry.size != key.size:
+                continue
+            distance = (entry.phash ^ key.phash).bit_count()
+            if distance < best_distance and (entry.fine ^ key.fine).bit_count() > self.confirm_distance:
+                continue  # same layout, different product (e.g. another flavour of the same pack)
+            if distance < best_distance:
+                best, best_distance = digest, distance
+        return best
+
+    def put(self, key, ingredients):
+        if self.maxsize <= 0 or not ingredients:
+            return  # пустой ответ OCR не кэшируем – скорее всего, неудачный снимок
+        with self._lock:
+            self._entries[key.digest] = _Entry(tuple(ingredients), key.phash, key.size, key.fine,
+                                                time.monotonic() + self.ttl)
+            self._entries.move_to_end(key.digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.near_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.near_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "max_distance": self.max_distance,
+                "confirm_distance": self.confirm_distance,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.near_hits) / total, 4) if total else 0.0,
+            }
+
+
+ocr_cache = OcrCache(OCR_CACHE_SIZE, OCR_CACHE_TTL, OCR_CACHE_MAX_DISTANCE)
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy import func
+
+from check import normalize_ingredient, tokenize_ingredients
+from models import db, Product
+
+# Поиск уже известного продукта по составу сразу после OCR: MinHash-подписи
+# множеств слов состава + LSH по полосам подписи. Кандидаты из LSH проверяются
+# точным коэффициентом Жаккара, так что совпадение – это действительно тот же состав.
+
+PRODUCT_MATCH_THRESHOLD = float(os.getenv("PRODUCT_MATCH_THRESHOLD", "0.8"))  # min Jaccard of word sets
+PRODUCT_INDEX_TTL = float(os.getenv("PRODUCT_INDEX_TTL", "300"))  # seconds between version checks
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4  # candidates from Jaccard ~0.5 up: (1/bands) ** (1/rows)
+MIN_WORDS = 3  # "вода" alone must not match every bottled water
+
+_rng = np.random.default_rng(20240601)  # fixed: signatures must agree across workers and restarts
+_A = _rng.integers(1, 2 ** 32, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 32, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+
+ProductMatch = namedtuple("ProductMatch", "product_id similarity name description_id")
+
+
+def ingredient_words(ingredients):
+    """Set of normalized words of an ingredient list (raw text or list)."""
+    words = set()
+    for ingredient in tokenize_ingredients(ingredients or ""):
+        words.update(normalize_ingredient(ingredient).split())
+    return frozenset(words)
+
+
+def minhash(words):
+    """MinHash signature of a word set: one 32-bit multiply-shift hash minimum per permutation."""
+    x = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    return ((_A[:, None] * x[None, :] + _B[:, None]) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+def _bands(signature):
+    rows = signature.reshape(MINHASH_BANDS, MINHASH_ROWS)
+    return [(band, rows[band].tobytes()) for band in range(MINHASH_BANDS)]
+
+
+class ProductIndex:
+    """LSH index of Product ingredient sets, kept per process and refreshed like the category registry."""
+
+    def __init__(self, threshold, ttl):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.version = None
+        self.checked_at = 0.0
+        self._buckets = {}    # (band, band bytes) -> [product ids]
+        self._products = {}   # product id -> (words, ProductMatch without similarity)
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self):
+        if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+            return
+        with self._lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+                return
+            version = db.session.query(func.count(Product.id), func.max(Product.id)).one()
+            if version != self.version:
+                self._load()
+                self.version = version
+                print(f"🔄 Индекс продуктов загружен: {len(self._products)}")
+            self.checked_at = time.monotonic()
+
+    def _load(self):
+        buckets, products = {}, {}
+        rows = (db.session.query(Product.id, Product.name, Product.ingredients, Product.description_id)
+                .filter(Product.ingredients.isnot(None))
+                .yield_per(1000))
+        for product_id, name, ingredients, description_id in rows:
+            words = ingredient_words(ingredients)
+            if len(words) < MIN_WORDS:
+                continue
+            products[product_id] = (words, (product_id, None, name, description_id))
+            for key in _bands(minhash(words)):
+                buckets.setdefault(key, []).append(product_id)
+        self._buckets, self._products = buckets, products
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self.checked_at = 0.0
+
+    def match(self, ingredients):
+        """The stored product whose ingredient words best match (Jaccard >= threshold), or None."""
+        words = ingredient_words(ingredients)
+        if len(words) < MIN_WORDS:
+            return None
+        self._ensure_fresh()
+        buckets, products = self._buckets, self._products
+
+        candidates = set()
+        for key in _bands(minhash(words)):
+            candidates.update(buckets.get(key, ()))
+
+        best, best_similarity = None, self.threshold
+        for product_id in candidates:
+            product_words, row = products[product_id]
+            similarity = len(words & product_words) / len(words | product_words)
+            if similarity >= best_similarity:
+                best, best_similarity = row, similarity
+        if best is None:
+            return None
+        return ProductMatch(best[0], round(best_similarity, 4), *best[2:])
+
+    def stats(self):
+        return {
+            "products": len(self._products),
+            "buckets": len(self._buckets),
+            "threshold": self.threshold,
+            "version": list(self.version) if self.version else None,
+            "ttl_s": self.ttl,
+        }
+
+
+product_index = ProductIndex(PRODUCT_MATCH_THRESHOLD, PRODUCT_INDEX_TTL)
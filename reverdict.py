@@ -0,0 +1,192 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+
+from check import (FUZZY_INGREDIENT_MATCH, HARAM, SUSPECTED, RULES_PATH, IngredientMatcher, check_halal_status_many, index_terms,
+                   parse_rules, rule_terms, tokenize_ingredients)
+from models import db, Product, ScanHistory, IngredientIndex
+
+# Пересчёт статусов продуктов и сканов после изменения правил.
+# Вместо полной перепроверки каталога находим через IngredientIndex только те
+# строки, в составе которых встречаются добавленные или удалённые термины.
+
+STATUS_HARAM = "таза емес"
+STATUS_SUSPECTED = "күмәнді"
+
+
+def _index_rows(rows, column):
+    mappings = [
+        {"term": term, column: row_id}
+        for row_id, ingredients in rows
+        for term in index_terms(tokenize_ingredients(ingredients or ""))
+        if len(term) <= 255
+    ]
+    if mappings:
+        db.session.bulk_insert_mappings(IngredientIndex, mappings)
+
+
+def sync_ingredient_index(chunk_size=1000, commit=True):
+    """Index products and scans added since the last sync. Returns (products, scans) indexed.
+
+    With commit=False the rows are only flushed, for the caller to roll back (dry runs).
+    """
+    counts = []
+    for model, column in ((Product, "product_id"), (ScanHistory, "scan_history_id")):
+        last_id = db.session.query(func.max(getattr(IngredientIndex, column))).scalar() or 0
+        indexed = 0
+        while True:
+            rows = (db.session.query(model.id, model.ingredients)
+                    .filter(model.id > last_id)
+                    .order_by(model.id)
+                    .limit(chunk_size)
+                    .all())
+            if not rows:
+                break
+            _index_rows(rows, column)
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
+            last_id = rows[-1][0]
+            indexed += len(rows)
+        counts.append(indexed)
+    return tuple(counts)
+
+
+def rebuild_ingredient_index(chunk_size=1000):
+    """Drop and re-create the whole index, e.g. after normalize_ingredient() changed."""
+    IngredientIndex.query.delete()
+    db.session.commit()
+    return sync_ingredient_index(chunk_size)
+
+
+def diff_rules(old_rules, new_rules):
+    """Terms whose classification differs between two rule sets (added, removed or moved)."""
+    old_pairs = {(kind, term.lower()) for kind in (HARAM, SUSPECTED) for term in old_rules[kind]}
+    new_pairs = {(kind, term.lower()) for kind in (HARAM, SUSPECTED) for term in new_rules[kind]}
+    added = {term for _, term in new_pairs - old_pairs}
+    removed = {term for _, term in old_pairs - new_pairs}
+    return added, removed
+
+
+def affected_rows(terms):
+    """IDs of products and scans whose ingredients could match any of the given rule terms.
+
+    Only exact (normalized) word matches are found: a row that a new term
+    would match only fuzzily (an OCR typo like "желатинн") is not returned.
+    """
+    product_ids, scan_ids = set(), set()
+    for term in terms:
+        keys = rule_terms(term)
+        if not keys:
+            continue
+        for column, ids in ((IngredientIndex.product_id, product_ids), (IngredientIndex.scan_history_id, scan_ids)):
+            rows = (db.session.query(column)
+                    .filter(IngredientIndex.term.in_(keys), column.isnot(None))
+                    .group_by(column)
+                    .having(func.count(func.distinct(IngredientIndex.term)) == len(keys))
+                    .all())
+            ids.update(row[0] for row in rows)
+    return product_ids, scan_ids
+
+
+def _found_terms(text):
+    return frozenset(term.strip() for term in (text or "").split(",") if term.strip())
+
+
+def _apply_verdict(row, verdict, is_product):
+    """Write a verdict to a Product / ScanHistory row if its status or found terms differ. Returns True if so.
+
+    Found terms are compared as sets, so rows stored in another order are left alone.
+    """
+    found = ", ".join(verdict["found_ingredients"]) or None  # sorted by check.py, as /process-images stores it
+    if is_product:
+        new = (verdict["status"],
+               found if verdict["status"] == STATUS_HARAM else None,
+               found if verdict["status"] == STATUS_SUSPECTED else None)
+        old = (row.status, row.haram_ingredients, row.suspect_ingredients)
+    else:
+        new = (verdict["status"], found)  # как в /process-images: найденные харам или сомнительные
+        old = (row.status, row.haram_ingredients)
+
+    if [old[0], *map(_found_terms, old[1:])] == [new[0], *map(_found_terms, new[1:])]:
+        return False
+    row.status, row.haram_ingredients = new[0], new[1]
+    if is_product:
+        row.suspect_ingredients = new[2]
+    return True
+
+
+def reverdict(old_rules, new_rules, chunk_size=500, dry_run=False, fuzzy=FUZZY_INGREDIENT_MATCH):
+    """Re-check only the products and scans affected by a rule change.
+
+    Each chunk of rows is evaluated against new_rules, with the same fuzzy
+    setting /process-images uses, and committed in its own transaction.
+    Returns a report with the term diff and every row whose status or found
+    terms changed. A dry run commits nothing, the ingredient index included.
+    """
+    added, removed = diff_rules(old_rules, new_rules)
+    report = {"added_terms": sorted(added), "removed_terms": sorted(removed),
+              "indexed": None, "checked": 0, "changed": []}
+    if not added and not removed:
+        return report
+
+    report["indexed"] = sync_ingredient_index(commit=not dry_run)
+    product_ids, scan_ids = affected_rows(added | removed)
+    matcher = IngredientMatcher(new_rules[HARAM], new_rules[SUSPECTED])
+
+    for model, ids, is_product in ((Product, product_ids, True), (ScanHistory, scan_ids, False)):
+        ids = sorted(ids)
+        for start in range(0, len(ids), chunk_size):
+            rows = model.query.filter(model.id.in_(ids[start:start + chunk_size])).all()
+            verdicts = check_halal_status_many((row.ingredients or "" for row in rows),
+                                               fuzzy=fuzzy, matcher=matcher)
+            for row, verdict in zip(rows, verdicts):
+                old_status = row.status
+                if _apply_verdict(row, verdict, is_product):
+                    report["changed"].append({
+                        "table": model.__tablename__,
+                        "id": row.id,
+                        "old_status": old_status,
+                        "new_status": row.status,
+                    })
+            report["checked"] += len(rows)
+            if dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+
+    if dry_run:
+        db.session.rollback()  # the index rows flushed above, if no chunk rolled them back
+    return report
+
+
+@click.command("reverdict")
+@click.option("--old-rules", "old_rules_path", required=True, type=click.Path(exists=True),
+              help="Rules file the stored verdicts were computed with.")
+@click.option("--new-rules", "new_rules_path", default=RULES_PATH, type=click.Path(exists=True),
+              help="Rules file to re-verdict against (defaults to the live RULES_PATH).")
+@click.option("--chunk-size", default=500, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Report changes without committing them.")
+@click.option("--fuzzy/--no-fuzzy", default=FUZZY_INGREDIENT_MATCH, show_default=True,
+              help="Typo-tolerant matching, as in /process-images (FUZZY_INGREDIENT_MATCH).")
+@click.option("--rebuild-index", is_flag=True,
+              help="Re-index all products and scans first (needed after normalization changes).")
+@with_appcontext
+def reverdict_command(old_rules_path, new_rules_path, chunk_size, dry_run, fuzzy, rebuild_index):
+    """Re-check stored products and scans affected by a rules change."""
+    if rebuild_index:
+        products, scans = rebuild_ingredient_index()
+        click.echo(f"Индекс перестроен: продуктов {products}, сканов {scans}")
+
+    with open(old_rules_path, "rb") as f:
+        old_rules = parse_rules(f.read())
+    with open(new_rules_path, "rb") as f:
+        new_rules = parse_rules(f.read())
+
+    report = reverdict(old_rules, new_rules, chunk_size=chunk_size, dry_run=dry_run, fuzzy=fuzzy)
+
+    click.echo(f"Добавлено терминов: {len(report['added_terms'])}, удалено: {len(report['removed_terms'])}")
+    click.echo(f"Проверено строк: {report['checked']}, статус изменился: {len(report['changed'])}")
+    for change in report["changed"]:
+        click.echo(f"  {change['table']} #{change['id']}: {change['old_status']} -> {change['new_status']}")
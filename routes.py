@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from operator import or_
 import ast
@@ -5,17 +6,20 @@ import re
 from flask import Blueprint, request, jsonify
 import requests
 from sqlalchemy.orm import joinedload
-from werkzeug.utils import secure_filename
 import os
 import json
-from check import check_halal_status
-from gcs_setting import upload_to_gcs
+from category_classifier import predict_category, shortlist_categories
+from category_registry import category_registry
+from check import FUZZY_INGREDIENT_MATCH, check_halal_status, tokenize_ingredients, verdict_cache_stats
+from gcs_setting import upload_bytes_to_gcs
+from image_preprocess import preprocess_image
+from ocr_cache import image_key, ocr_cache
+from product_index import product_index
 from models import db, Product, Description, Review, User, Favourite, ScanHistory
 from flask_jwt_extended import jwt_required,get_jwt_identity
 import base64
 import google.generativeai as genai
 from dotenv import load_dotenv
-import psycopg2
 
 from utils import get_alternative_products_endpoint
 
@@ -23,32 +27,43 @@ load_dotenv()
 
 routes = Blueprint('routes', __name__)
 
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# One structured Gemini call for ingredients + category instead of two (falls back to two on bad output)
+GEMINI_COMBINED_CALL = os.getenv('GEMINI_COMBINED_CALL', 'True').lower() == 'true'
+
+# Threads for the I/O-bound pipeline stages that run alongside each other (GCS upload, category lookup)
+SCAN_STAGE_WORKERS = int(os.getenv('SCAN_STAGE_WORKERS', '16'))
+_stage_pool = ThreadPoolExecutor(max_workers=SCAN_STAGE_WORKERS, thread_name_prefix="scan-stage")
+
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel('gemini-1.5-pro-latest') #using gemini-pro-vision to send images.
 
 
 
-UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
-# Ensure upload folder exists
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
 def allowed_file(filename):
     """Check if uploaded file has an allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+class ScanError(Exception):
+    """A pipeline failure with the JSON error payload /process-images answers with."""
+
+    def __init__(self, message, code=500, **extra):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.extra = extra
+
+    def to_dict(self):
+        return {"status": "error", "message": self.message, **self.extra, "code": self.code}
+
+
 @routes.route("/process-images", methods=["POST"])
 def process_images():
     """Extracts text from an image, determines product category, checks ingredients for Halal compliance."""
@@ -58,9 +73,6 @@ def process_images():
         return jsonify({"status": "error", "message": "Файл не найден", "code": 400}), 400
 
     file = request.files['file']
-    image_url = upload_to_gcs(file)
-    file.stream.seek(0)
-    print(image_url)
 
     if file.filename == '':
         return jsonify({"status": "error", "message": "Файл не выбран", "code": 400}), 400
@@ -68,157 +80,274 @@ def process_images():
     if not allowed_file(file.filename):
         return jsonify({"status": "error", "message": "Неверный формат файла", "code": 400}), 400
 
-    # Step 2: Save file securely
     try:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        data = run_scan_pipeline(file.read(), file.filename, file.content_type, get_jwt_identity())
+    except ScanError as e:
+        return jsonify(e.to_dict()), e.code
     except Exception as e:
-        return jsonify({"status": "error", "message": f"Ошибка сохранения файла: {str(e)}", "code": 500}), 500
+        return jsonify({"status": "error", "message": f"Ошибка обработки изображения: {str(e)}", "code": 500}), 500
+
+    # Step 10: Return response
+    return jsonify({
+        "status": "success",
+        "message": "Файл успешно загружен",
+        "data": data
+    }), 200
+
+
+def run_scan_pipeline(image_bytes, filename, content_type, user_id):
+    """Upload, OCR, categorize and halal-check one label photo; saves a ScanHistory row and returns the response data.
+
+    Shared by /process-images and the background scan jobs (scan_jobs.py). Raises ScanError.
+    Independent stages overlap: the GCS upload runs while OCR does, and the
+    category lookup runs while the halal check does.
+    """
+    # Step 2a: Orient, downscale and recompress before anything is uploaded or sent to Gemini
+    image_bytes, filename, content_type, preprocess_stats = preprocess_image(image_bytes, filename, content_type)
+    print(f"Image preprocessing: {preprocess_stats}")
+
+    # Step 2b: GCS, hashing and OCR all share this one immutable buffer; the upload
+    # only matters for the ScanHistory row, so it runs in the background meanwhile
+    upload_future = _stage_pool.submit(upload_bytes_to_gcs, image_bytes, filename, content_type)
+
+    # Step 3: Same photo (or a near-duplicate shot) scanned before -> reuse its OCR result
+    cache_key = image_key(image_bytes)
+    cached = ocr_cache.get(cache_key)
+    ai_category = None
+    if cached:
+        ingredients_list, cache_hit = cached
+        print(f"OCR cache hit ({cache_hit}): {len(ingredients_list)} ingredients")
+    else:
+        if GEMINI_COMBINED_CALL:
+            # Step 4a: One structured Gemini call for both the ingredients and the category
+            combined = extract_ingredients_and_category_ai(image_bytes, content_type)
+            if combined:
+                ingredients_list, ai_category = combined
+        if ai_category is None:
+            # Step 4b: Two-call path: OCR here, category in resolve_category()
+            ingredients_list = extract_ingredients_ai(image_bytes, content_type)
+
+        ocr_cache.put(cache_key, ingredients_list)
+
+    # Step 5: A product we already have (same ingredient set)? Reuse its category.
+    # The verdict is always recomputed: a near match may differ by exactly the haram ingredient
+    known_product = product_index.match(ingredients_list)
+    if known_product:
+        print(f"Known product #{known_product.product_id} (similarity {known_product.similarity})")
+
+    # Steps 6-7: Generate category using AI and match it against the DB, in the background
+    category_future = None
+    if not (known_product and known_product.description_id):
+        category_future = _stage_pool.submit(resolve_category, ingredients_list, ai_category)
+
+    # Step 8: Check halal status
+    halal_result = check_halal_status(ingredients_list, fuzzy=FUZZY_INGREDIENT_MATCH)
+    halal_status = halal_result["status"]
+    found_ingredients = halal_result["found_ingredients"]
+    fuzzy_matches = halal_result.get("fuzzy_matches", [])
 
     try:
-        # Step 3: Convert image to Base64 for Gemini OCR
-        with open(filepath, "rb") as image_file:
-            img_b64_str = base64.b64encode(image_file.read()).decode("utf-8")
-
-        # Step 4: Extract ingredients from image using Gemini
-        response = model.generate_content([
-            "Ты OCR-ассистент, твоя задача – извлекать состав продукта из текста на изображении.\n\n"
-            "Инструкция:\n"
-            "1. Извлеки **только состав продукта, написанный на русском или казахском языках**. "
-            "Игнорируй текст на всех других языках.\n"
-            "2. Выдели все ингредиенты и добавки отдельно (например: \"вода\", \"сок манго\", \"қышқыл\", \"сукралоза\", \"лимонная кислота\", \"E102\", \"E110\").\n"
-            "3. Если встречаются добавки вида \"E100\", \"E121\" и другие с префиксом E, выделяй их отдельно как индивидуальные элементы.\n"
-            "4. Верни результат строго в формате JSON-массива, без дополнительных комментариев или пояснений.",
+        image_url = upload_future.result()
+        print(image_url)
+    except Exception as e:
+        raise ScanError(f"Ошибка сохранения файла: {str(e)}")
 
-        {
-            "mime_type": file.content_type,
-            "data": img_b64_str
-         }
-        ])
+    if category_future:
+        final_category, description_id = category_future.result()
+    else:
+        description_id = known_product.description_id
+        final_category = category_registry.get(description_id) or known_product.name
 
-        import logging
+    # Debugging Logs
+    print(f"Final category: {final_category}")
+    print(f"Description ID: {description_id} (type: {type(description_id)})")
+    print(f"Found Haram Ingredients: {found_ingredients}")
 
+    # Step 9: Insert product to DB
+    # insert_product(ingredients_list, filepath, halal_status, description_id, found_ingredients)
 
-        try:
-            raw_text = response.candidates[0].content.parts[0].text.strip()
-            logging.info("Gemini extracted raw text:\n%s", raw_text)
+    new_scan = ScanHistory(
+        user_id=user_id,
+        product_name=final_category,
+        image=image_url,
+        ingredients=", ".join(ingredients_list),  # Список ингредиентов как текст
+        scan_date=datetime.utcnow(),
+        status=halal_status,
+        haram_ingredients=", ".join(found_ingredients) if found_ingredients else None,
+        description_id=description_id,
+        # Харамные ингредиенты, если есть
+        product_id=known_product.product_id if known_product else None  # похожий продукт из базы
+    )
 
-            cleaned_text = re.sub(r"^```json\s*|\s*```$", "", raw_text, flags=re.IGNORECASE).strip()
-            ingredients_list = json.loads(cleaned_text)
+    db.session.add(new_scan)
+    db.session.commit()
 
-        except json.JSONDecodeError as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Ошибка обработки JSON: {str(e)}",
-                "raw_text": raw_text,
-                "code": 500
-            }), 500
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Ошибка при обработке ответа от Gemini: {str(e)}",
-                "code": 500
-            }), 500
+    alt_data = get_alternative_products_endpoint(description_id)
+
+    # In case someone later changes the helper to return (data, status_code)
+    if isinstance(alt_data, tuple):
+        alt_data = alt_data[0]
+
+    alternatives_data = alt_data
+
+    return {
+        "scan_id": new_scan.id,
+        "file_path": image_url,
+        "extracted_text": ingredients_list,
+        "category": final_category,
+        "description_id": description_id,
+        "halal_status": halal_status,
+        "found_ingredients": found_ingredients,
+        "fuzzy_matches": fuzzy_matches,
+        "alternatives_data": alternatives_data,
+        "product_id": known_product.product_id if known_product else None,
+        "image_bytes_saved": preprocess_stats["bytes_saved"]
+    }
+
+OCR_PROMPT = (
+    "Ты OCR-ассистент, твоя задача – извлекать состав продукта из текста на изображении.\n\n"
+    "Инструкция:\n"
+    "1. Извлеки **только состав продукта, написанный на русском или казахском языках**. "
+    "Игнорируй текст на всех других языках.\n"
+    "2. Выдели все ингредиенты и добавки отдельно (например: \"вода\", \"сок манго\", \"қышқыл\", \"сукралоза\", \"лимонная кислота\", \"E102\", \"E110\").\n"
+    "3. Если встречаются добавки вида \"E100\", \"E121\" и другие с префиксом E, выделяй их отдельно как индивидуальные элементы.\n"
+)
+
+
+def extract_ingredients_ai(image_bytes, content_type):
+    """OCR of the ingredient list via Gemini (raw bytes, the client encodes them itself). Raises ScanError."""
+    response = model.generate_content([
+        OCR_PROMPT +
+        "4. Верни результат строго в формате JSON-массива, без дополнительных комментариев или пояснений.",
+
+    {
+        "mime_type": content_type,
+        "data": image_bytes
+     }
+    ])
 
+    import logging
 
 
-        # Step 6: Generate category using AI
-        ai_category = generate_category_ai(ingredients_list)
+    try:
+        raw_text = response.candidates[0].content.parts[0].text.strip()
+        logging.info("Gemini extracted raw text:\n%s", raw_text)
 
-        # Step 7: Check if category exists in DB
-        category_db_name, description_id = find_existing_category(ai_category)
+        cleaned_text = re.sub(r"^```json\s*|\s*```$", "", raw_text, flags=re.IGNORECASE).strip()
+        # One long string or nested groups ("шоколад (какао, E471)") -> flat list
+        return tokenize_ingredients(json.loads(cleaned_text))
 
-        if not description_id:
-            # Category doesn't exist, insert new category
-            description_id = insert_category(ai_category)
-            final_category = ai_category
-        else:
-            final_category = category_db_name
-
-        # Step 8: Check halal status
-        halal_result = check_halal_status(ingredients_list)
-        halal_status = halal_result["status"]
-        found_ingredients = halal_result["found_ingredients"]
-
-        # Debugging Logs
-        print(f"Final category: {final_category}")
-        print(f"Description ID: {description_id} (type: {type(description_id)})")
-        print(f"Found Haram Ingredients: {found_ingredients}")
-
-        # Step 9: Insert product to DB
-        # insert_product(ingredients_list, filepath, halal_status, description_id, found_ingredients)
-
-        new_scan = ScanHistory(
-            user_id=get_jwt_identity(),
-            product_name=final_category,
-            image=image_url,
-            ingredients=", ".join(ingredients_list),  # Список ингредиентов как текст
-            scan_date=datetime.utcnow(),
-            status=halal_status,
-            haram_ingredients=", ".join(found_ingredients) if found_ingredients else None,
-            description_id=description_id
-            # Харамные ингредиенты, если есть
+    except json.JSONDecodeError as e:
+        raise ScanError(f"Ошибка обработки JSON: {str(e)}", raw_text=raw_text)
+    except Exception as e:
+        raise ScanError(f"Ошибка при обработке ответа от Gemini: {str(e)}")
+
+
+def extract_ingredients_and_category_ai(image_bytes, content_type):
+    """OCR and categorization in a single structured Gemini call.
+
+    Returns (ingredients_list, category), or None when the call fails or its
+    JSON doesn't validate, so the caller can fall back to the two-call path.
+    """
+    prompt = (
+        OCR_PROMPT +
+        "4. Определи категорию продукта по составу. Если подходит одна из существующих категорий, выбери её; "
+        "иначе предложи новую, максимально краткую (не более 2 слов).\n"
+        f"Существующие категории: {', '.join(shortlist_categories())}.\n\n"
+        "Верни строго JSON-объект без пояснений: "
+        "{\"ingredients\": [\"ингредиент\", ...], \"category\": \"категория\"}"
+    )
+
+    try:
+        response = model.generate_content(
+            [prompt, {"mime_type": content_type, "data": image_bytes}],
+            generation_config={"response_mime_type": "application/json"}
         )
+        raw_text = response.candidates[0].content.parts[0].text.strip()
+        cleaned_text = re.sub(r"^```json\s*|\s*```$", "", raw_text, flags=re.IGNORECASE).strip()
+        result = json.loads(cleaned_text)
+
+        ingredients = result.get("ingredients")
+        category = result.get("category")
+        if (not isinstance(ingredients, list) or not ingredients
+                or not all(isinstance(item, str) for item in ingredients)
+                or not isinstance(category, str) or not sanitize_category(category)):
+            raise ValueError(f"unexpected structure: {cleaned_text[:200]}")
+    except Exception as e:
+        print(f"⚠️ Совмещённый запрос к Gemini не прошёл проверку, переходим на два запроса: {e}")
+        return None
 
-        db.session.add(new_scan)
-        db.session.commit()
+    return tokenize_ingredients(ingredients), sanitize_category(category.lower())
 
-        alt_data = get_alternative_products_endpoint(description_id)
 
-        # In case someone later changes the helper to return (data, status_code)
-        if isinstance(alt_data, tuple):
-            alt_data = alt_data[0]
+@routes.route("/check-ingredients", methods=["POST"])
+def check_ingredients():
+    """Checks raw ingredient text (OCR output, scraped composition) or a stored product without the LLM."""
+    data = request.get_json() or {}
+    ingredients = data.get("ingredients")
 
-        alternatives_data = alt_data
+    if ingredients is None and data.get("product_id"):
+        product = Product.query.get(data["product_id"])
+        if not product:
+            return jsonify({"status": "error", "message": "Продукт не найден", "code": 404}), 404
+        ingredients = product.ingredients or ""
 
+    if not ingredients:
+        return jsonify({"status": "error", "message": "ingredients или product_id обязательны", "code": 400}), 400
 
+    ingredients_list = tokenize_ingredients(ingredients)
+    halal_result = check_halal_status(ingredients_list, fuzzy=FUZZY_INGREDIENT_MATCH)
 
+    return jsonify({
+        "status": "success",
+        "data": {
+            "ingredients": ingredients_list,
+            "halal_status": halal_result["status"],
+            "found_ingredients": halal_result["found_ingredients"],
+            "fuzzy_matches": halal_result.get("fuzzy_matches", [])
+        }
+    }), 200
 
-        # Step 10: Return response
-        return jsonify({
-            "status": "success",
-            "message": "Файл успешно загружен",
-            "data": {
-                "file_path": image_url,
-                "extracted_text": ingredients_list,
-                "category": final_category,
-                "description_id": description_id,
-                "halal_status": halal_status,
-                "found_ingredients": found_ingredients,
-                "alternatives_data": alternatives_data
-            }
-        }), 200
 
-    except Exception as e:
-        return jsonify({"status": "error", "message": f"Ошибка обработки изображения: {str(e)}", "code": 500}), 500
-    
-def find_existing_category(category_name):
-    """Check if the given category exists in the description table."""
-    conn = psycopg2.connect(DB_URL)
-    cur = conn.cursor()
+def resolve_category(ingredients_list, ai_category=None):
+    """AI category for the ingredients, mapped onto an existing description row (created if missing).
 
-    category_name = category_name.lower().strip()
+    ai_category is passed when the combined Gemini call already produced it.
+    Otherwise a confident local prediction (category_classifier) saves the Gemini call.
+    """
+    if ai_category is None:
+        # Step 6a: Local TF-IDF classifier trained on the product catalog
+        prediction = predict_category(ingredients_list)
+        if prediction:
+            description_id, confidence = prediction
+            category_name = category_registry.get(description_id)
+            if category_name:
+                print(f"Local category: {category_name} ({confidence:.2f})")
+                return category_name, description_id
 
-    # Check if category exists using a case-insensitive search
-    cur.execute("SELECT id, name FROM description WHERE LOWER(name) LIKE %s", (f"%{category_name}%",))
-    result = cur.fetchone()
+        # Step 6b: Generate category using AI
+        ai_category = generate_category_ai(ingredients_list)
 
-    conn.close()
+    # Step 7: Check if category exists in DB
+    category_db_name, description_id = find_existing_category(ai_category)
 
-    if result:
-        return result[1], result[0]  # Return category name and ID
-    return None, None  # If not found, return None
+    if not description_id:
+        # Category doesn't exist, insert new category
+        description_id = insert_category(ai_category)
+        return ai_category, description_id
+    return category_db_name, description_id
+
+
+def find_existing_category(category_name):
+    """Check if the given category exists in the description table (in-memory, see category_registry)."""
+    return category_registry.find(category_name)  # (category name, ID) or (None, None)
 
 
 def generate_category_ai(ingredients):
     """Generates a precise food category based on ingredients, choosing from existing categories when possible."""
     
-    conn = psycopg2.connect(DB_URL)
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM description")
-    existing_categories = [row[0].lower() for row in cur.fetchall()]
-    conn.close()
+    # Only the top-k closest categories go into the prompt, whatever the catalog size
+    existing_categories = shortlist_categories(ingredients)
 
     prompt = (
         # "Ты эксперт по классификации продуктов. Определи категорию продукта по его составу.\n\n"
@@ -274,16 +403,8 @@ def sanitize_category(category_text):
 
 
 def insert_category(category_name):
-    """Inserts a new category into the database."""
-    conn = psycopg2.connect(DB_URL)
-    cur = conn.cursor()
-
-    cur.execute("INSERT INTO description (name) VALUES (%s) RETURNING id", (category_name,))
-    category_id = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
-
-    return category_id
+    """Inserts a new category into the database and the in-memory registry."""
+    return category_registry.insert(category_name)
 
 
 # def insert_product(ingredients, image_path, halal_status, description_id, found_ingredients):
@@ -703,27 +824,47 @@ def get_scans():
         for scan in scans
     ])
 
-from PIL import Image
-import uuid
+from PIL import UnidentifiedImageError
 import io
-from ultralytics import YOLO
 import psutil
 
-# logo_recognizer = YOLO('logo_recognizer/best.pt')
-# logo_recognizer = YOLO('https://storage.googleapis.com/quram_product_photo/best.pt')
-# Global variable to store YOLO model
-logo_recognizer = None
+from logo_batcher import LOGO_MICROBATCH, logo_batcher
+from logo_model import LogoModelUnavailable, decode_image, logo_model
+
+LOGO_ECHO = os.getenv('LOGO_ECHO', 'thumbnail').lower()  # company_logo in the response: none, thumbnail or full
+LOGO_THUMBNAIL_SIZE = int(os.getenv('LOGO_THUMBNAIL_SIZE', '256'))
+LOGO_BATCH_SIZE = int(os.getenv('LOGO_BATCH_SIZE', '16'))  # images per forward pass
+LOGO_BATCH_MAX_IMAGES = int(os.getenv('LOGO_BATCH_MAX_IMAGES', '64'))  # images per /process-logo/batch request
 
 def get_logo_model():
-    global logo_recognizer
-    if logo_recognizer is None:
-        logo_recognizer = YOLO('https://storage.googleapis.com/quram_product_photo/best.pt')  # Load locally stored model
-        logo_recognizer.model.fuse = lambda *args, **kwargs: logo_recognizer.model  # Disable fuse if needed
-    return logo_recognizer
+    """Logo detector (torch or ONNX backend), loaded once per worker from the checksum-verified local cache (see logo_model.py)."""
+    return logo_model.get()
+
+def logo_echo(image, data, content_type, mode):
+    """(base64, mime type) of the image to echo back, or (None, None) for mode "none".
+
+    "full" returns the uploaded bytes as-is; "thumbnail" a small JPEG of the decoded image.
+    """
+    if mode == "full":
+        return base64.b64encode(data).decode('utf-8'), content_type
+    if mode == "thumbnail":
+        thumbnail = image.copy()
+        thumbnail.thumbnail((LOGO_THUMBNAIL_SIZE, LOGO_THUMBNAIL_SIZE))
+        out = io.BytesIO()
+        thumbnail.save(out, format='JPEG', quality=80)
+        return base64.b64encode(out.getvalue()).decode('utf-8'), 'image/jpeg'
+    return None, None
 
 # Whitelist of known halal companies
 HALAL_COMPANIES = {'alel', 'balqymyz', 'flint', 'grizzly', 'jacobs'}
 
+def whitelist_status(detected_names):
+    """Status message for the brands detected on one image."""
+    matched_company = HALAL_COMPANIES.intersection(detected_names)
+    if matched_company:
+        return f"{sorted(matched_company)[0].capitalize()} is on our whitelist and has 100% halal production"
+    return "We do not have this company in our whitelist"
+
 @routes.route("/process-logo", methods=["POST"])
 def process_logo():
     # Memory check before processing the logo
@@ -734,44 +875,31 @@ def process_logo():
         return jsonify({"status": "error", "message": "No file uploaded", "code": 400}), 400
 
     file = request.files["file"]
+    echo = request.values.get("echo", LOGO_ECHO).lower()
+    if echo not in ("none", "thumbnail", "full"):
+        return jsonify({"status": "error", "message": "echo must be none, thumbnail or full", "code": 400}), 400
 
-    # Open the image from the file stream without saving it
-    image = Image.open(file.stream)
-
-    # Save the image temporarily
-    temp_filename = f"{uuid.uuid4().hex}.png"
-    temp_filepath = os.path.join("temp", temp_filename)
-    os.makedirs(os.path.dirname(temp_filepath), exist_ok=True)
-    image.save(temp_filepath)
-
-    # Convert image to Base64 to send in the response
-    image_bytes = io.BytesIO()
-    image.save(image_bytes, format='PNG')
-    image_bytes.seek(0)
-    image_b64 = base64.b64encode(image_bytes.getvalue()).decode('utf-8')
-
-    # Get YOLO model
-    logo_rec = get_logo_model()
-
-    # Predict using YOLOv8 with the saved image file
-    results = logo_rec.predict(source=temp_filepath, conf=0.25)  # Use file path here
-    detected_names = set()
-
-    for result in results:
-        for box in result.boxes:
-            cls_id = int(box.cls[0])
-            name = logo_rec.names[cls_id].lower()
-            detected_names.add(name)
+    # Decode once, in memory; the decoded image goes straight to the model
+    data = file.read()
+    try:
+        image, _ = decode_image(data)
+    except (UnidentifiedImageError, OSError):
+        return jsonify({"status": "error", "message": "Uploaded file is not a valid image", "code": 400}), 400
 
-    matched_company = HALAL_COMPANIES.intersection(detected_names)
+    # Predict with the configured backend (LOGO_BACKEND: torch or onnx), sharing
+    # a forward pass with concurrent requests when micro-batching is on
+    try:
+        if LOGO_MICROBATCH:
+            detections = logo_batcher.detect(image, conf=0.25)
+        else:
+            detections = get_logo_model().detect([image], conf=0.25)[0]
+    except LogoModelUnavailable as e:
+        return jsonify({"status": "error", "message": f"Logo model unavailable: {e}", "code": 503}), 503
+    detected_names = {detection.name for detection in detections}
 
-    if matched_company:
-        status = f"{matched_company.pop().capitalize()} is on our whitelist and has 100% halal production"
-    else:
-        status = "We do not have this company in our whitelist"
+    status = whitelist_status(detected_names)
 
-    # Clean up the temporary file
-    os.remove(temp_filepath)
+    image_b64, image_mime = logo_echo(image, data, file.mimetype, echo)
 
     # Memory check after processing the logo
     final_memory = process.memory_info().rss / 1024**2  # Memory after processing (in MB)
@@ -779,12 +907,68 @@ def process_logo():
     # Return JSON response along with memory usage
     return jsonify({
         "status": "success",
-        "company_logo": image_b64,  # Base64 encoded image
+        "company_logo": image_b64,  # Base64 image per echo mode (None for "none")
+        "company_logo_type": image_mime,
         "status_message": status,
         "initial_memory_mb": round(initial_memory, 2),
         "final_memory_mb": round(final_memory, 2)
     }), 200
 
+def _decode_upload(file):
+    try:
+        return decode_image(file.read())
+    except (UnidentifiedImageError, OSError):
+        return None
+
+@routes.route("/process-logo/batch", methods=["POST"])
+def process_logo_batch():
+    """Logo detection for several images ("files") in one request, run through the model in batches."""
+    files = request.files.getlist("files")
+    if not files:
+        return jsonify({"status": "error", "message": "No files uploaded", "code": 400}), 400
+    if len(files) > LOGO_BATCH_MAX_IMAGES:
+        return jsonify({"status": "error", "message": f"At most {LOGO_BATCH_MAX_IMAGES} images per request",
+                        "code": 413}), 413
+
+    # Decoding releases the GIL, so images decode in parallel
+    decoded = list(_stage_pool.map(_decode_upload, files))
+    valid = [i for i, item in enumerate(decoded) if item is not None]
+
+    try:
+        logo_rec = get_logo_model()
+    except LogoModelUnavailable as e:
+        return jsonify({"status": "error", "message": f"Logo model unavailable: {e}", "code": 503}), 503
+    detections = {}
+    for start in range(0, len(valid), LOGO_BATCH_SIZE):
+        chunk = valid[start:start + LOGO_BATCH_SIZE]
+        for i, image_detections in zip(chunk, logo_rec.detect([decoded[i][0] for i in chunk], conf=0.25)):
+            detections[i] = image_detections
+
+    results = []
+    for i, file in enumerate(files):
+        if decoded[i] is None:
+            results.append({"filename": file.filename, "status": "error",
+                            "message": "Uploaded file is not a valid image", "code": 400})
+            continue
+        scale = decoded[i][1]
+        detected_names = {detection.name for detection in detections[i]}
+        results.append({
+            "filename": file.filename,
+            "status": "success",
+            "detections": [
+                {
+                    "name": detection.name,
+                    "confidence": round(detection.confidence, 4),
+                    "box": [round(v * scale, 1) for v in detection.box],  # x1, y1, x2, y2 in original pixels
+                }
+                for detection in detections[i]
+            ],
+            "whitelisted": sorted(HALAL_COMPANIES.intersection(detected_names)),
+            "status_message": whitelist_status(detected_names),
+        })
+
+    return jsonify({"status": "success", "count": len(results), "results": results}), 200
+
 @routes.route("/debug-memory", methods=["GET"])
 def memory_check():
     import psutil
@@ -792,3 +976,33 @@ def memory_check():
     mem = process.memory_info().rss / 1024**2  # in MB
     return jsonify({"memory_usage_mb": round(mem, 2)})
 
+
+@routes.route("/debug-verdict-cache", methods=["GET"])
+def verdict_cache_check():
+    return jsonify(verdict_cache_stats())
+
+
+@routes.route("/debug-category-registry", methods=["GET"])
+def category_registry_check():
+    return jsonify(category_registry.stats())
+
+
+@routes.route("/debug-product-index", methods=["GET"])
+def product_index_check():
+    return jsonify(product_index.stats())
+
+
+@routes.route("/debug-logo-model", methods=["GET"])
+def logo_model_check():
+    return jsonify(logo_model.status())
+
+
+@routes.route("/debug-logo-batcher", methods=["GET"])
+def logo_batcher_check():
+    return jsonify(logo_batcher.stats())
+
+
+@routes.route("/debug-ocr-cache", methods=["GET"])
+def ocr_cache_check():
+    return jsonify(ocr_cache.stats())
+
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from models import db, ScanJob
+from routes import ScanError, allowed_file, run_scan_pipeline
+
+# Асинхронный режим /process-images: фото принимается сразу, клиент получает
+# job_id и опрашивает GET /scan-jobs/<id>. Конвейер (GCS, Gemini, категории,
+# проверка состава) выполняется в ограниченном пуле потоков, а не в веб-воркере.
+
+scan_jobs = Blueprint("scan_jobs", __name__)
+
+SCAN_JOB_WORKERS = int(os.getenv("SCAN_JOB_WORKERS", "8"))  # pipelines running at once
+SCAN_JOB_QUEUE_SIZE = int(os.getenv("SCAN_JOB_QUEUE_SIZE", "64"))  # accepted but not finished jobs per process
+
+_executor = ThreadPoolExecutor(max_workers=SCAN_JOB_WORKERS, thread_name_prefix="scan-job")
+_slots = threading.BoundedSemaphore(SCAN_JOB_QUEUE_SIZE)
+
+
+def _set_status(job_id, **fields):
+    job = ScanJob.query.get(job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+
+
+def _run_job(app, job_id, image_bytes, filename, content_type, user_id):
+    """Worker body: runs the scan pipeline for one job and stores its outcome."""
+    try:
+        with app.app_context():
+            try:
+                _set_status(job_id, status="running")
+                data = run_scan_pipeline(image_bytes, filename, content_type, user_id)
+                _set_status(job_id, status="done", result=json.dumps(data, ensure_ascii=False),
+                            scan_history_id=data["scan_id"])
+            except ScanError as e:
+                db.session.rollback()
+                _set_status(job_id, status="error", error=json.dumps(e.to_dict(), ensure_ascii=False))
+            except Exception as e:
+                traceback.print_exc()
+                db.session.rollback()
+                _set_status(job_id, status="error", error=json.dumps({
+                    "status": "error",
+                    "message": f"Ошибка обработки изображения: {str(e)}",
+                    "code": 500
+                }, ensure_ascii=False))
+            finally:
+                db.session.remove()
+    finally:
+        _slots.release()
+
+
+@scan_jobs.route("/scan-jobs", methods=["POST"])
+def create_scan_job():
+    """Accepts a label photo and queues the /process-images pipeline for it; returns the job id at once."""
+    if 'file' not in request.files:
+        return jsonify({"status": "error", "message": "Файл не найден", "code": 400}), 400
+
+    file = request.files['file']
+
+    if file.filename == '':
+        return jsonify({"status": "error", "message": "Файл не выбран", "code": 400}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({"status": "error", "message": "Неверный формат файла", "code": 400}), 400
+
+    if not _slots.acquire(blocking=False):
+        return jsonify({"status": "error", "message": "Очередь сканирования переполнена, попробуйте позже", "code": 503}), 503
+
+    try:
+        user_id = get_jwt_identity()
+        job = ScanJob(user_id=user_id, status="queued")
+        db.session.add(job)
+        db.session.commit()
+
+        _executor.submit(_run_job, current_app._get_current_object(), job.id,
+                         file.read(), file.filename, file.content_type, user_id)
+    except Exception as e:
+        _slots.release()
+        return jsonify({"status": "error", "message": f"Не удалось создать задачу: {str(e)}", "code": 500}), 500
+
+    return jsonify({
+        "status": "success",
+        "message": "Задача поставлена в очередь",
+        "data": {"job_id": job.id, "job_status": job.status}
+    }), 202
+
+
+@scan_jobs.route("/scan-jobs/<int:job_id>", methods=["GET"])
+def get_scan_job(job_id):
+    """Status of a scan job; once done, carries the same data /process-images would have returned."""
+    job = ScanJob.query.get(job_id)
+    if not job or str(job.user_id) != str(get_jwt_identity()):
+        return jsonify({"status": "error", "message": "Задача не найдена", "code": 404}), 404
+
+    return jsonify({
+        "status": "success",
+        "data": {
+            "job_id": job.id,
+            "job_status": job.status,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+            "result": json.loads(job.result) if job.result else None,
+            "error": json.loads(job.error) if job.error else None
+        }
+    }), 200